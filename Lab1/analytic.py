@@ -0,0 +1,97 @@
+import math
+from typing import Dict
+
+# Хвост ряда для среднего максимума геометрических величин отбрасывается ниже этой доли
+TAIL_EPSILON = 1e-9
+
+
+def delivery_probability(packet_loss_prob: float, corruption_prob: float) -> float:
+    """Вероятность, что пакет данных дойдет целым"""
+    return (1 - packet_loss_prob) * (1 - corruption_prob)
+
+
+def expected_max_failures(success_prob: float, count: int) -> float:
+    """Среднее максимума числа неудачных попыток среди count независимых пакетов
+
+    Число неудач одного пакета геометрическое: P(неудач >= j) = (1 - s)^j, поэтому
+    E[max] = sum_j (1 - (1 - (1 - s)^j)^count).
+    """
+    fail_prob = 1 - success_prob
+    if fail_prob <= 0:
+        return 0.0
+    total = 0.0
+    tail = fail_prob
+    while True:
+        term = 1 - (1 - tail) ** count
+        total += term
+        if term < TAIL_EPSILON:
+            return total
+        tail *= fail_prob
+
+
+def expected_performance(protocol_type: str, data_length: int, window_size: int = 1, package_data_size: int = 2,
+                         packet_loss_prob: float = 0.2, ack_loss_prob: float = 0.1, corruption_prob: float = 0.1,
+                         timeout: float = 2.0, propagation_delay: float = 0.0005) -> Dict:
+    """Аналитическая оценка тех же метрик, что у ProtocolSimulator и simulate_batch
+
+    Исходы пакетов независимы; потерянный пакет обнаруживается по таймауту
+    (timeout отсчитывается от отправки), удачный обмен занимает RTT.
+
+    Stop-and-Wait - частный случай Go-Back-N с окном 1.
+    Go-Back-N: раунд - отправка окна до первой неудачи; успех раунда s^W,
+    продвижение за раунд s(1 - s^W)/(1 - s) пакетов, неудачный раунд стоит
+    таймаут. Кумулятивные ACK: таймаут из-за подтверждений - только когда
+    потеряны все W подтверждений окна. k = 1 + W(1 - s)/s (после ошибки
+    окно повторяется целиком).
+    Selective Repeat: каждый пакет (данные и свой ACK) повторяется до успеха,
+    k = 1/s; окна по W пакетов ждут самый неудачный пакет - E[max] неудач.
+    Время SR - оценка сверху: окна считаются по очереди, а настоящее окно
+    скользит и частично перекрывает повторы соседних пакетов.
+    """
+    if protocol_type == "auto":
+        protocol_type = "stop_and_wait" if window_size == 1 else "go_back_n"
+    if protocol_type == "stop_and_wait":
+        window_size = 1
+
+    n_packets = math.ceil(data_length / package_data_size)
+    useful_packets = data_length // package_data_size
+    rtt = 2 * propagation_delay
+    delivered = delivery_probability(packet_loss_prob, corruption_prob)
+
+    if protocol_type == "selective_repeat":
+        success = delivered * (1 - ack_loss_prob)
+        if success <= 0:
+            return _unreachable(protocol_type)
+        k_packet = 1 / success
+        blocks = math.ceil(n_packets / window_size)
+        total_time = blocks * (rtt + timeout * expected_max_failures(success, window_size))
+    else:
+        success = delivered * (1 - ack_loss_prob ** window_size)
+        if success <= 0:
+            return _unreachable(protocol_type)
+        k_packet = 1 + window_size * (1 - success) / success
+        window_success = success ** window_size
+        progress = success * (1 - window_success) / (1 - success) if success < 1 else window_size
+        failed_rounds = n_packets / progress * (1 - window_success)
+        total_time = failed_rounds * timeout + math.ceil(n_packets / window_size) * rtt
+
+    total_sent = k_packet * n_packets
+    k = total_sent / useful_packets if useful_packets > 0 else 0.0
+    return {
+        'protocol_type': protocol_type,
+        'k': k,
+        'total_time': total_time,
+        'total_sent': total_sent,
+        'efficiency': 1 / k if k > 0 else 0
+    }
+
+
+def _unreachable(protocol_type: str) -> Dict:
+    # Ни один обмен не может завершиться - передача бесконечна
+    return {
+        'protocol_type': protocol_type,
+        'k': math.inf,
+        'total_time': math.inf,
+        'total_sent': math.inf,
+        'efficiency': 0
+    }
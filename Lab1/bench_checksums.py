@@ -0,0 +1,28 @@
+import os
+import timeit
+from checksum import CHECKSUMS
+from packet import Packet
+
+
+def bench_strategy(name: str, payload: bytes, number: int) -> float:
+    """Стоимость одного пакета: создание (расчет суммы) + проверка на приеме, мкс"""
+    def roundtrip():
+        Packet(0, payload, checksum=name).verify_hash()
+
+    return min(timeit.repeat(roundtrip, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 100_000):
+    sizes = [2, 64, 1024]
+    payloads = {size: os.urandom(size) for size in sizes}
+
+    print("Стоимость контрольной суммы на пакет (создание + verify_hash), мкс")
+    print(f"{'Стратегия':<12}" + ''.join(f"{f'{size} байт':<12}" for size in sizes))
+    print("-" * (12 + 12 * len(sizes)))
+    for name in CHECKSUMS:
+        costs = [bench_strategy(name, payloads[size], number) for size in sizes]
+        print(f"{name:<12}" + ''.join(f"{cost:<12.3f}" for cost in costs))
+
+
+if __name__ == "__main__":
+    main()
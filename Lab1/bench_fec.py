@@ -0,0 +1,49 @@
+import os
+import numpy as np
+from sweep import run_sweep
+
+
+def summarize(rows):
+    """Средние по повторам: передач на полезный пакет (k), время, восстановлено по четности"""
+    return (np.mean([row['k'] for row in rows]),
+            np.mean([row['total_time'] for row in rows]),
+            np.mean([row['fec_recovered'] for row in rows]),
+            all(row['success'] for row in rows))
+
+
+def main(replications: int = 20, size: int = 18_000, seed: int = 2024):
+    data = os.urandom(size)
+    loss_probs = [0.1, 0.3, 0.5, 0.6]
+    groups = [None, 8, 4, 2]  # None - обычный ARQ без четности
+    protocols = [
+        ('Stop-and-Wait', "stop_and_wait", 1),
+        ('Go-Back-N', "go_back_n", 4),
+        ('Selective Repeat', "selective_repeat", 4)
+    ]
+
+    grid = [{'window_size': window_size, 'protocol_type': protocol_type, 'packet_loss_prob': p,
+             'fec_group': group, 'replication': replication}
+            for _, protocol_type, window_size in protocols
+            for p in loss_probs
+            for group in groups
+            for replication in range(replications)]
+    rows = run_sweep(grid, seed=seed, data=data, package_data_size=180, timeout=0.2,
+                     ack_loss_prob=0.05, corruption_prob=0.05)
+
+    print(f"FEC против ARQ: {size} байт, {replications} повторов на точку")
+    print(f"{'Протокол':<18} {'p':<6} {'Группа':<8} {'k':<8} {'Время, с':<10} {'Восстановлено':<14}")
+    print("-" * 66)
+    for name, protocol_type, _ in protocols:
+        for p in loss_probs:
+            for group in groups:
+                point = [row for row in rows if row['protocol_type'] == protocol_type and
+                         row['packet_loss_prob'] == p and row['fec_group'] == group]
+                k, total_time, recovered, success = summarize(point)
+                status = "" if success else " (ошибка сборки)"
+                label = "ARQ" if group is None else f"1/{group}"
+                print(f"{name:<18} {p:<6} {label:<8} {k:<8.2f} {total_time:<10.2f} {recovered:<14.1f}{status}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
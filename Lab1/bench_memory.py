@@ -0,0 +1,52 @@
+import hashlib
+import sys
+import time
+import tracemalloc
+from packet_store import PacketTable
+
+
+class LegacyPacket:
+    """Прежняя раскладка: отдельный объект со словарем атрибутов на каждый сегмент"""
+
+    def __init__(self, seq_num: int, data: str):
+        self.seq_num = seq_num
+        self.data = data
+        self.hash_sum = hashlib.sha256(data.encode()).hexdigest()
+        self.sent_time = None
+        self.ack_received = False
+
+
+def build_legacy(data: str, package_data_size: int):
+    return [LegacyPacket(i // package_data_size, data[i:i + package_data_size])
+            for i in range(0, len(data), package_data_size)]
+
+
+def build_table(data: str, package_data_size: int):
+    return PacketTable(data, package_data_size)
+
+
+def measure(builder, data: str, package_data_size: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = builder(data, package_data_size)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current, peak, elapsed
+
+
+def main(segments: int = 1_000_000, package_data_size: int = 2):
+    data = ("HelloWorld" * (segments * package_data_size // 10 + 1))[:segments * package_data_size]
+
+    print(f"Сегментов: {segments}, размер сегмента: {package_data_size} байт")
+    print(f"{'Раскладка':<22} {'Память, МБ':<12} {'Пик, МБ':<12} {'Байт/сегмент':<14} {'Время, с':<10}")
+    print("-" * 72)
+    for name, builder in (("list[Packet]", build_legacy), ("PacketTable", build_table)):
+        current, peak, elapsed = measure(builder, data, package_data_size)
+        print(f"{name:<22} {current / 2**20:<12.1f} {peak / 2**20:<12.1f} "
+              f"{current / segments:<14.1f} {elapsed:<10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
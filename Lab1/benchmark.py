@@ -0,0 +1,228 @@
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from clock import VirtualClock
+from network import NetworkSimulator
+from packet import Packet
+from receiver import Receiver
+from sender import Sender
+from simulator import ProtocolSimulator
+
+PROTOCOLS = [
+    ('Stop-and-Wait', "stop_and_wait", 1),
+    ('Go-Back-N', "go_back_n", 16),
+    ('Selective Repeat', "selective_repeat", 16)
+]
+SIZES = [1_000, 100_000, 1_000_000]
+PACKAGE_DATA_SIZE = 2
+CHUNK = 1000  # Пакеты для получателя готовятся порциями вне замера
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@contextmanager
+def _gc_paused():
+    # Мусор прошлых замеров собирается заранее, а сборщик не срабатывает внутри замера:
+    # иначе освобождение чужих остатков дает отрицательный прирост блоков
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _retained_since(blocks: int) -> int:
+    # Циклический мусор самого замера не считается оставшимся в памяти
+    gc.collect()
+    return sys.getallocatedblocks() - blocks
+
+
+def run_simulator(protocol_type: str, window_size: int, packets: int, seed: int = 0) -> ProtocolSimulator:
+    simulator = ProtocolSimulator(bytes(packets * PACKAGE_DATA_SIZE), window_size, protocol_type, clock='virtual',
+                                  package_data_size=PACKAGE_DATA_SIZE, timeout=0.2, packet_loss_prob=0.01,
+                                  ack_loss_prob=0.01, corruption_prob=0.0, seed=seed)
+    if not simulator.run_simulation():
+        raise RuntimeError(f"{protocol_type}: данные собраны с ошибкой")
+    return simulator
+
+
+def bench_simulator(name: str, protocol_type: str, window_size: int, packets: int) -> dict:
+    """Полный прогон на виртуальных часах: скорость без tracemalloc, память - отдельным прогоном
+
+    blocks_per_packet - прирост числа занятых блоков памяти за прогон на пакет,
+    то есть сколько объектов на пакет остается жить; пик - по tracemalloc.
+    """
+    with _gc_paused():
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        simulator = run_simulator(protocol_type, window_size, packets)
+        elapsed = time.perf_counter() - start
+    retained = _retained_since(blocks)
+    events = simulator.stats['iterations']
+    del simulator
+
+    tracemalloc.start()
+    run_simulator(protocol_type, window_size, packets)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'component': 'ProtocolSimulator',
+        'protocol': name,
+        'packets': packets,
+        'seconds': elapsed,
+        'packets_per_sec': packets / elapsed,
+        'events_per_sec': events / elapsed,
+        'blocks_per_packet': retained / packets,
+        'peak_bytes': peak,
+        'peak_bytes_per_packet': peak / packets
+    }
+
+
+def _operation_row(component: str, packets: int, elapsed: float, retained: int) -> dict:
+    return {
+        'component': component,
+        'protocol': None,
+        'packets': packets,
+        'seconds': elapsed,
+        'packets_per_sec': packets / elapsed,
+        'blocks_per_packet': retained / packets
+    }
+
+
+def bench_send(packets: int) -> dict:
+    # Окно на всю передачу: каждый вызов отдает новый пакет
+    sender = Sender(bytes(packets * PACKAGE_DATA_SIZE), PACKAGE_DATA_SIZE, packets, clock=VirtualClock())
+    send = sender.send_new_packet
+    with _gc_paused():
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        for _ in range(packets):
+            send()
+        elapsed = time.perf_counter() - start
+    return _operation_row('Sender.send_new_packet', packets, elapsed, _retained_since(blocks))
+
+
+def bench_receive(packets: int) -> dict:
+    receiver = Receiver(PACKAGE_DATA_SIZE)
+    payload = bytes(PACKAGE_DATA_SIZE)
+    hash_sum = Packet(0, payload).hash_sum
+    receive = receiver.receive_packet
+    elapsed = 0.0
+    with _gc_paused():
+        blocks = sys.getallocatedblocks()
+        for chunk_start in range(0, packets, CHUNK):
+            chunk_end = min(chunk_start + CHUNK, packets)
+            chunk = [Packet(seq_num, payload, hash_sum) for seq_num in range(chunk_start, chunk_end)]
+            start = time.perf_counter()
+            for packet in chunk:
+                receive(packet)
+            elapsed += time.perf_counter() - start
+        del chunk, packet
+    return _operation_row('Receiver.receive_packet', packets, elapsed, _retained_since(blocks))
+
+
+def bench_verify(packets: int) -> dict:
+    packet = Packet(0, bytes(PACKAGE_DATA_SIZE))
+    verify = packet.verify_hash
+    with _gc_paused():
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        for _ in range(packets):
+            verify()
+        elapsed = time.perf_counter() - start
+    return _operation_row('Packet.verify_hash', packets, elapsed, _retained_since(blocks))
+
+
+def bench_transmit(packets: int) -> dict:
+    # Канал без потерь; доставленные пакеты забираются порциями, чтобы очередь не росла
+    network = NetworkSimulator(0.0, 0.0, 0.0, clock=VirtualClock())
+    packet = Packet(0, bytes(PACKAGE_DATA_SIZE))
+    transmit = network.transmit_packet
+    in_transit = network.packets_in_transit
+    with _gc_paused():
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        for i in range(packets):
+            transmit(packet)
+            if i % CHUNK == 0:
+                in_transit.clear()
+        elapsed = time.perf_counter() - start
+        in_transit.clear()
+    return _operation_row('NetworkSimulator.transmit_packet', packets, elapsed, _retained_since(blocks))
+
+
+def git_commit() -> str:
+    try:
+        # Коммит репозитория с бенчмарком, а не текущего каталога
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=MODULE_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes=SIZES) -> dict:
+    results = []
+    for packets in sizes:
+        for name, protocol_type, window_size in PROTOCOLS:
+            results.append(bench_simulator(name, protocol_type, window_size, packets))
+        for bench in (bench_send, bench_receive, bench_verify, bench_transmit):
+            results.append(bench(packets))
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'results': results
+    }
+
+
+def _key(row: dict):
+    return row['component'], row['protocol'], row['packets']
+
+
+def compare(baseline: dict, current: dict):
+    """Отношение скорости текущего прогона к базовому (< 1 - регрессия)"""
+    old = {_key(row): row for row in baseline['results']}
+    print(f"\nСравнение с {baseline.get('commit')} ({baseline.get('timestamp')})")
+    print(f"{'Компонент':<34} {'Протокол':<18} {'Пакетов':<10} {'Скорость':<10} {'Пик памяти':<10}")
+    print("-" * 86)
+    for row in current['results']:
+        before = old.get(_key(row))
+        if before is None:
+            continue
+        speed = row['packets_per_sec'] / before['packets_per_sec']
+        memory = f"{row['peak_bytes'] / before['peak_bytes']:.2f}x" if 'peak_bytes' in row else ""
+        print(f"{row['component']:<34} {row['protocol'] or '':<18} {row['packets']:<10} {speed:<10.2f} {memory:<10}")
+
+
+def main(output: str = "benchmark.json", baseline: str = None, sizes=SIZES):
+    report = run_benchmarks(sizes)
+
+    print(f"Бенчмарк ARQ-стека (коммит {report['commit']}, Python {report['python']})")
+    print(f"{'Компонент':<34} {'Протокол':<18} {'Пакетов':<10} {'Пакетов/с':<12} {'Блоков/пакет':<14} "
+          f"{'Пик, МБ':<10}")
+    print("-" * 100)
+    for row in report['results']:
+        peak = f"{row['peak_bytes'] / 2**20:.2f}" if 'peak_bytes' in row else ""
+        print(f"{row['component']:<34} {row['protocol'] or '':<18} {row['packets']:<10} "
+              f"{row['packets_per_sec']:<12.0f} {row['blocks_per_packet']:<14.3f} {peak:<10}")
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты записаны в {output}")
+
+    if baseline is not None:
+        with open(baseline, encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    # python benchmark.py [вывод.json [базовый.json]]
+    main(sys.argv[1] if len(sys.argv) > 1 else "benchmark.json", sys.argv[2] if len(sys.argv) > 2 else None)
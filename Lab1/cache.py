@@ -0,0 +1,99 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, Optional
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Модули, от которых результаты прогонов не зависят: графики, бенчмарки, тесты и сам кэш
+UNVERSIONED_MODULES = ('main.py', 'benchmark.py', 'cache.py')
+UNVERSIONED_PREFIXES = ('bench_', 'test_')
+DEFAULT_PATH = os.path.join(MODULE_DIR, 'results_cache.sqlite')
+
+
+def code_version() -> str:
+    """Хэш исходников моделирования: правка любого из них делает старые строки недействительными"""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(MODULE_DIR, '*.py'))):
+        name = os.path.basename(path)
+        if name in UNVERSIONED_MODULES or name.startswith(UNVERSIONED_PREFIXES):
+            continue
+        digest.update(name.encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _data_digest(data) -> Optional[str]:
+    if isinstance(data, str):
+        data = data.encode()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(data).hexdigest()
+    return None  # Файл или итератор - содержимое заранее неизвестно
+
+
+class ResultCache:
+    """Результаты прогонов run_point на диске (SQLite)
+
+    Ключ - параметры точки (протокол, окно, размер пакета, вероятности, таймаут и
+    прочие аргументы ProtocolSimulator), SHA-256 данных, seed точки и версия кода.
+    Точки с параметрами-объектами (модель ошибок, политика таймаута, поток вывода)
+    не кэшируются: их состояние не сводится к ключу. Прогоны с кэшем
+    воспроизводимы: если run_sweep вызван без seed, используется seed кэша.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, seed: int = 0):
+        self.path = path
+        self.seed = seed
+        self.version = code_version()
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, version TEXT NOT NULL, params TEXT NOT NULL, row TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def key(self, params: Dict, seed: int) -> Optional[str]:
+        """Ключ точки или None, если точку нельзя кэшировать"""
+        params = dict(params)
+        digest = _data_digest(params.pop('data', None))
+        if digest is None:
+            return None
+        try:
+            text = json.dumps({'params': params, 'data': digest, 'seed': seed, 'version': self.version},
+                              sort_keys=True, allow_nan=True)
+        except TypeError:
+            return None
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[Dict]:
+        if key is None:
+            return None
+        found = self.connection.execute("SELECT row FROM results WHERE key = ?", (key,)).fetchone()
+        if found is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(found[0])
+
+    def put(self, key: Optional[str], params: Dict, row: Dict):
+        if key is None:
+            return
+        stored = {name: value for name, value in params.items() if name != 'data'}
+        self.connection.execute("INSERT OR REPLACE INTO results (key, version, params, row) VALUES (?, ?, ?, ?)",
+                                (key, self.version, json.dumps(stored, sort_keys=True), json.dumps(row)))
+
+    def commit(self):
+        self.connection.commit()
+
+    def purge_stale(self) -> int:
+        """Удаляет строки, посчитанные другими версиями кода"""
+        deleted = self.connection.execute("DELETE FROM results WHERE version != ?", (self.version,)).rowcount
+        self.connection.commit()
+        return deleted
+
+    def close(self):
+        self.connection.close()
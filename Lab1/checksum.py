@@ -0,0 +1,42 @@
+import hashlib
+import zlib
+from typing import Callable, Dict
+
+# Стратегия по умолчанию: CRC32 ловит все одиночные и пакетные ошибки до 32 бит
+DEFAULT_CHECKSUM = 'crc32'
+
+
+def internet_checksum(data: bytes) -> int:
+    """16-битная контрольная сумма Интернета (RFC 1071)"""
+    if len(data) % 2:
+        data = bytes(data) + b'\0'
+    # Данные как число по основанию 2^16: так как 2^16 = 1 (mod 2^16 - 1), сумма 16-битных
+    # слов в обратном коде равна остатку от деления на 0xFFFF - считаем её одной операцией
+    value = int.from_bytes(data, 'big')
+    total = value % 0xFFFF
+    if total == 0 and value:
+        total = 0xFFFF
+    return ~total & 0xFFFF
+
+
+def sha256_checksum(data: bytes) -> int:
+    # Первые 64 бита SHA-256 - помещаются в целое без знака, как и остальные суммы
+    return int.from_bytes(hashlib.sha256(data).digest()[:8], 'big')
+
+
+CHECKSUMS: Dict[str, Callable[[bytes], int]] = {
+    'internet': internet_checksum,
+    'crc32': zlib.crc32,
+    'adler32': zlib.adler32,
+    'sha256': sha256_checksum
+}
+
+
+def get_checksum(strategy=None) -> Callable[[bytes], int]:
+    if strategy is None:
+        strategy = DEFAULT_CHECKSUM
+    if callable(strategy):
+        return strategy
+    if strategy not in CHECKSUMS:
+        raise ValueError(f"Неизвестная контрольная сумма: {strategy}. Доступны: {', '.join(CHECKSUMS)}")
+    return CHECKSUMS[strategy]
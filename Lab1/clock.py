@@ -0,0 +1,49 @@
+import time
+
+
+class WallClock:
+    """Реальное время: используется для наглядных демонстраций"""
+
+    def now(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Виртуальное (модельное) время, которое двигает очередь событий"""
+
+    def __init__(self, start: float = 0.0):
+        self.current_time = start
+
+    def now(self) -> float:
+        return self.current_time
+
+    def sleep(self, seconds: float):
+        self.current_time += seconds
+
+    def advance_to(self, timestamp: float):
+        # Время в модели никогда не идет назад
+        if timestamp > self.current_time:
+            self.current_time = timestamp
+
+
+class LoopClock:
+    """Время цикла событий asyncio (монотонное): таймеры ставятся через loop.call_at"""
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def now(self) -> float:
+        return self.loop.time()
+
+
+def make_clock(kind) -> object:
+    if kind is None or kind == "wall":
+        return WallClock()
+    if kind == "virtual":
+        return VirtualClock()
+    if hasattr(kind, "now"):
+        return kind
+    raise ValueError(f"Неизвестный тип часов: {kind}")
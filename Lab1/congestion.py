@@ -0,0 +1,88 @@
+class RenoCongestionControl:
+    """Окно перегрузки в стиле TCP Reno (в пакетах)
+
+    Медленный старт: окно растет на 1 за каждый подтвержденный пакет, пока не
+    достигнет порога ssthresh; затем предотвращение перегрузки - примерно +1 за RTT.
+    Потеря по таймауту сбрасывает окно до 1, по дубликатам ACK - уменьшает вдвое.
+    """
+
+    def __init__(self, initial_window: float = 1.0, ssthresh: float = 64.0, min_window: float = 1.0):
+        self.cwnd = initial_window
+        self.ssthresh = ssthresh
+        self.min_window = min_window
+
+    @property
+    def window(self) -> int:
+        return max(int(self.cwnd), 1)
+
+    def on_ack(self, acked: int):
+        for _ in range(acked):
+            if self.cwnd < self.ssthresh:
+                self.cwnd += 1
+            else:
+                self.cwnd += 1 / self.cwnd
+
+    def on_loss(self, timeout: bool):
+        self.ssthresh = max(self.cwnd / 2, 2.0)
+        self.cwnd = self.min_window if timeout else self.ssthresh
+
+
+class CubicCongestionControl(RenoCongestionControl):
+    """Окно перегрузки в стиле CUBIC (RFC 8312)
+
+    После потери окно уменьшается в beta раз и растет по кубической функции
+    времени от момента потери, возвращаясь к прежнему максимуму W_max за время K.
+    Рост не медленнее Reno-оценки (TCP-friendly область), которая считается
+    по числу подтвержденных пакетов.
+    """
+
+    def __init__(self, clock, initial_window: float = 1.0, ssthresh: float = 64.0, c: float = 0.4,
+                 beta: float = 0.7, min_window: float = 1.0):
+        super().__init__(initial_window, ssthresh, min_window)
+        self.clock = clock
+        self.c = c
+        self.beta = beta
+        self.w_max = None
+        self.epoch_start = None
+        self.k = 0.0
+        self.w_est = 0.0
+
+    def on_ack(self, acked: int):
+        if self.cwnd < self.ssthresh:
+            super().on_ack(acked)
+            return
+
+        now = self.clock.now()
+        if self.epoch_start is None:
+            # Начало эпохи роста: вогнутая часть кривой ведет обратно к W_max
+            self.epoch_start = now
+            self.w_max = max(self.w_max or 0.0, self.cwnd)
+            self.k = (self.w_max * (1 - self.beta) / self.c) ** (1 / 3)
+            self.w_est = self.cwnd
+
+        elapsed = now - self.epoch_start
+        target = self.c * (elapsed - self.k) ** 3 + self.w_max
+        alpha = 3 * (1 - self.beta) / (1 + self.beta)
+        self.w_est += alpha * acked / self.cwnd
+        target = max(target, self.w_est)
+        if target > self.cwnd:
+            # Не больше чем удвоение за окно, как у медленного старта
+            self.cwnd = min(target, self.cwnd + acked)
+
+    def on_loss(self, timeout: bool):
+        self.w_max = self.cwnd
+        self.epoch_start = None
+        self.ssthresh = max(self.cwnd * self.beta, 2.0)
+        self.cwnd = self.min_window if timeout else self.ssthresh
+
+
+def make_congestion_control(congestion, clock):
+    if congestion is None:
+        return None
+    if congestion == "reno":
+        return RenoCongestionControl()
+    if congestion == "cubic":
+        return CubicCongestionControl(clock)
+    if hasattr(congestion, 'on_loss'):
+        return congestion
+    raise ValueError(f"Неизвестный алгоритм управления перегрузкой: {congestion}")
@@ -0,0 +1,193 @@
+import itertools
+import math
+import random
+from typing import Iterator, Optional
+import numpy as np
+
+# Сколько равномерных чисел вытягивается из генератора NumPy за раз
+BATCH_SIZE = 4096
+
+
+class BatchedRandom(random.Random):
+    """Интерфейс random.Random поверх собственного генератора NumPy
+
+    Равномерные числа заранее вытягиваются пачками по batch_size, и розыгрыш
+    исхода - это взятие следующего числа из буфера. randrange, randint и
+    остальные методы random.Random работают через random(), поэтому весь
+    поток случайности определяется одним seed.
+    """
+
+    def __init__(self, generator=None, batch_size: int = BATCH_SIZE):
+        # generator - seed, SeedSequence или готовый numpy.random.Generator
+        self.generator = np.random.default_rng(generator)
+        self.batch_size = batch_size
+        # Бесконечная цепочка пачек: взятие числа - вызов на C без кадра Python
+        batches = iter(lambda: self.generator.random(self.batch_size).tolist(), None)
+        self.next_uniform = itertools.chain.from_iterable(batches).__next__
+        super().__init__(0)
+        # Атрибут экземпляра перекрывает метод класса: rng.random() сразу берет число из буфера
+        self.random = self.next_uniform
+
+    def random(self) -> float:
+        return self.next_uniform()
+
+
+def bind_rng(model, rng):
+    """Модели без своего генератора получают генератор канала
+
+    Заменяется отсутствующий генератор (rng=None) и генератор другого канала (модель,
+    переиспользуемая между прогонами); явно переданный random.Random сохраняется.
+    Несвязанная модель не держит ссылок на модуль random, поэтому ее можно передать
+    в пул процессов (run_sweep с workers > 1).
+    """
+    if hasattr(model, 'rng') and (model.rng is None or isinstance(model.rng, BatchedRandom)):
+        model.rng = rng
+    for inner in getattr(model, 'models', ()):
+        bind_rng(inner, rng)
+
+
+def _geometric(rng, prob: float) -> int:
+    """Число испытаний до первого успеха включительно (>= 1); при prob <= 0 - бесконечность"""
+    if prob >= 1:
+        return 1
+    if prob <= 0:
+        return math.inf
+    return 1 + int(math.log(1.0 - rng.random()) / math.log1p(-prob))
+
+
+def _bad_share(p_good_to_bad: float, p_bad_to_good: float, bad: bool) -> float:
+    # Стационарная доля плохого состояния; без переходов цепь остается в текущем состоянии
+    total = p_good_to_bad + p_bad_to_good
+    if total <= 0:
+        return 1.0 if bad else 0.0
+    return p_good_to_bad / total
+
+
+def _error_positions(rng, start: int, end: int, ber: float) -> Iterator[int]:
+    # Вместо розыгрыша каждого бита сразу прыгаем к следующей ошибке:
+    # промежутки между ошибками распределены геометрически, стоимость O(число ошибок)
+    if ber <= 0:
+        return
+    position = start + _geometric(rng, ber) - 1
+    while position < end:
+        yield position
+        position += _geometric(rng, ber)
+
+
+def _flip_bits(data: bytes, positions) -> bytes:
+    corrupted = None
+    for position in positions:
+        if corrupted is None:
+            corrupted = bytearray(data)
+        corrupted[position >> 3] ^= 0x80 >> (position & 7)
+    return data if corrupted is None else bytes(corrupted)
+
+
+class PacketCorruption:
+    """Пакет целиком портится с заданной вероятностью (прежнее поведение канала)"""
+
+    def __init__(self, probability: float, rng=None):
+        self.probability = probability
+        self.rng = rng
+
+    def apply(self, data: bytes) -> Optional[bytes]:
+        if not data or not self.probability or self.rng.random() >= self.probability:
+            return data
+        # Один случайный байт меняется на гарантированно другое значение
+        corrupted = bytearray(data)
+        corrupted[self.rng.randrange(len(data))] ^= self.rng.randint(1, 255)
+        return bytes(corrupted)
+
+
+class BitErrorModel:
+    """Независимые ошибки в битах с вероятностью ber (двоичный симметричный канал)"""
+
+    def __init__(self, ber: float, rng=None):
+        self.ber = ber
+        self.rng = rng
+
+    def apply(self, data: bytes) -> Optional[bytes]:
+        return _flip_bits(data, _error_positions(self.rng, 0, len(data) * 8, self.ber))
+
+
+class GilbertElliottModel:
+    """Двухсостоятельный канал Гилберта-Эллиотта с пакетированием ошибок
+
+    Канал переходит между хорошим и плохим состоянием побитно; время пребывания
+    в состоянии разыгрывается сразу геометрическим распределением, поэтому
+    стоимость пропорциональна числу переходов и ошибок, а не длине пакета.
+    Состояние сохраняется между пакетами.
+    """
+
+    def __init__(self, p_good_to_bad: float, p_bad_to_good: float, ber_good: float = 0.0,
+                 ber_bad: float = 0.1, rng=None):
+        self.p_good_to_bad = p_good_to_bad
+        self.p_bad_to_good = p_bad_to_good
+        self.ber_good = ber_good
+        self.ber_bad = ber_bad
+        self.rng = rng
+        self.bad = False
+        self.remaining = None  # Бит до смены состояния
+
+    def mean_ber(self) -> float:
+        bad_share = _bad_share(self.p_good_to_bad, self.p_bad_to_good, self.bad)
+        return bad_share * self.ber_bad + (1 - bad_share) * self.ber_good
+
+    def _sojourn(self) -> int:
+        return _geometric(self.rng, self.p_bad_to_good if self.bad else self.p_good_to_bad)
+
+    def apply(self, data: bytes) -> Optional[bytes]:
+        if self.remaining is None:
+            self.remaining = self._sojourn()
+
+        total_bits = len(data) * 8
+        positions = []
+        position = 0
+        while position < total_bits:
+            span = min(self.remaining, total_bits - position)
+            ber = self.ber_bad if self.bad else self.ber_good
+            positions.extend(_error_positions(self.rng, position, position + span, ber))
+            position += span
+            self.remaining -= span
+            if self.remaining == 0:
+                self.bad = not self.bad
+                self.remaining = self._sojourn()
+        return _flip_bits(data, positions)
+
+
+class BurstLossModel:
+    """Пакетные потери: цепь Гилберта над пакетами, в плохом состоянии пакеты теряются"""
+
+    def __init__(self, p_good_to_bad: float, p_bad_to_good: float, loss_good: float = 0.0,
+                 loss_bad: float = 1.0, rng=None):
+        self.p_good_to_bad = p_good_to_bad
+        self.p_bad_to_good = p_bad_to_good
+        self.loss_good = loss_good
+        self.loss_bad = loss_bad
+        self.rng = rng
+        self.bad = False
+
+    def mean_loss(self) -> float:
+        bad_share = _bad_share(self.p_good_to_bad, self.p_bad_to_good, self.bad)
+        return bad_share * self.loss_bad + (1 - bad_share) * self.loss_good
+
+    def apply(self, data: bytes) -> Optional[bytes]:
+        if self.rng.random() < (self.p_bad_to_good if self.bad else self.p_good_to_bad):
+            self.bad = not self.bad
+        if self.rng.random() < (self.loss_bad if self.bad else self.loss_good):
+            return None
+        return data
+
+
+class CompositeModel:
+    """Последовательное применение нескольких моделей (например, потери + битовые ошибки)"""
+
+    def __init__(self, *models):
+        self.models = models
+
+    def apply(self, data: bytes) -> Optional[bytes]:
+        for model in self.models:
+            data = model.apply(data)
+            if data is None:
+                return None
+        return data
@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional
+from packet import Packet
+from checksum import get_checksum
+
+# Длина сегмента в блоке четности (последний сегмент передачи бывает короче);
+# столько же байт занимает число пакетов группы в пакете четности
+LENGTH_BYTES = 2
+MAX_GROUP_SIZE = (1 << 8 * LENGTH_BYTES) - 1
+
+
+class ParityPacket(Packet):
+    """Пакет четности группы; seq_num - номер первого пакета группы"""
+    __slots__ = ()
+
+
+def _block(data: bytes, size: int) -> int:
+    # Сегмент с длиной впереди, дополненный нулями до общего размера, как число для XOR
+    return int.from_bytes(len(data).to_bytes(LENGTH_BYTES, 'big') + bytes(data).ljust(size - LENGTH_BYTES, b'\0'),
+                          'big')
+
+
+def _group_count(parity: Packet) -> int:
+    return int.from_bytes(parity.data[:LENGTH_BYTES], 'big')
+
+
+class FecEncoder:
+    """XOR-четность над группами из group_size подряд идущих пакетов
+
+    Группа g покрывает номера [g * group_size, (g + 1) * group_size). После первой
+    отправки последнего пакета группы в канал уходит пакет четности:
+    число пакетов в группе и XOR всех сегментов. Избыточность - 1 / group_size.
+    Повторные передачи четность не меняют.
+    """
+
+    def __init__(self, group_size: int, package_data_size: int, checksum=None):
+        if not 1 <= group_size <= MAX_GROUP_SIZE:
+            raise ValueError(f"Размер группы FEC должен быть от 1 до {MAX_GROUP_SIZE}")
+        self.group_size = group_size
+        self.block_size = package_data_size + LENGTH_BYTES
+        self.checksum = get_checksum(checksum)
+        self.group_start = 0
+        self.count = 0
+        self.parity = 0
+        self.parity_sent = 0
+
+    def on_send(self, packet: Packet) -> Optional[ParityPacket]:
+        # Вызывается для новых пакетов, которые отправитель выдает строго по порядку
+        self.parity ^= _block(packet.data, self.block_size)
+        self.count += 1
+        if self.count == self.group_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[ParityPacket]:
+        # Четность неполной группы - в конце передачи
+        if self.count == 0:
+            return None
+        data = self.count.to_bytes(LENGTH_BYTES, 'big') + self.parity.to_bytes(self.block_size, 'big')
+        parity = ParityPacket(self.group_start, data, checksum=self.checksum)
+        self.group_start += self.count
+        self.count = 0
+        self.parity = 0
+        self.parity_sent += 1
+        return parity
+
+
+class FecDecoder:
+    """Восстановление одного потерянного пакета группы по пакету четности
+
+    Принятые целыми пакеты группы запоминаются; как только есть четность и все
+    пакеты, кроме одного, недостающий сегмент собирается XOR-ом без ожидания
+    таймаута. Для получателя Go-Back-N (in_order) после восстановленного пакета
+    повторно выдаются следующие пакеты группы - он их отбросил как пришедшие
+    не по порядку. Группы ниже границы, уже принятой получателем, забываются.
+    """
+
+    def __init__(self, group_size: int, package_data_size: int, checksum=None, in_order: bool = False):
+        self.group_size = group_size
+        self.block_size = package_data_size + LENGTH_BYTES
+        self.checksum = get_checksum(checksum)
+        self.in_order = in_order
+        self.groups: Dict[int, list] = {}  # Первый номер группы -> [пакеты по номерам, четность]
+        self.recovered = 0
+
+    def on_receive(self, packet: Packet, floor: int) -> List[Packet]:
+        """Пакеты для получателя; floor - первый номер, которого получатель еще ждет"""
+        self._forget_below(floor)
+        intact = packet.verify_hash()
+        group_start = packet.seq_num - packet.seq_num % self.group_size
+
+        if isinstance(packet, ParityPacket):
+            if intact and packet.seq_num + _group_count(packet) > floor:
+                self._group(group_start)[1] = packet
+                return self._recover(group_start)
+            return []
+
+        if intact and packet.seq_num >= floor:
+            self._group(group_start)[0][packet.seq_num] = packet
+            return [packet] + self._recover(group_start)
+        return [packet]
+
+    def _group(self, group_start: int) -> list:
+        group = self.groups.get(group_start)
+        if group is None:
+            group = self.groups[group_start] = [{}, None]
+        return group
+
+    def _forget_below(self, floor: int):
+        if len(self.groups) > 1:
+            for group_start in [start for start in self.groups if start + self.group_size <= floor]:
+                del self.groups[group_start]
+
+    def _recover(self, group_start: int) -> List[Packet]:
+        received, parity = self.groups[group_start]
+        if parity is None:
+            return []
+        count = _group_count(parity)
+        if len(received) != count - 1:
+            return []
+
+        missing = next(seq_num for seq_num in range(group_start, group_start + count)
+                       if seq_num not in received)
+        block = int.from_bytes(parity.data[LENGTH_BYTES:], 'big')
+        for packet in received.values():
+            block ^= _block(packet.data, self.block_size)
+        raw = block.to_bytes(self.block_size, 'big')
+        length = int.from_bytes(raw[:LENGTH_BYTES], 'big')
+        rebuilt = Packet(missing, raw[LENGTH_BYTES:LENGTH_BYTES + length], checksum=self.checksum)
+
+        del self.groups[group_start]
+        self.recovered += 1
+        if not self.in_order:
+            return [rebuilt]
+        return [rebuilt] + [received[seq_num] for seq_num in sorted(received) if seq_num > missing]
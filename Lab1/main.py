@@ -2,9 +2,18 @@ import matplotlib.pyplot as plt
 import csv
 import os
 from datetime import datetime
-from simulator import ProtocolSimulator
+from montecarlo import simulate_batch
+from analytic import expected_performance
+from sweep import run_sweep
+from replication import run_replicated
+from cache import ResultCache
+from multiflow import MultiFlowSimulator
+from errors import BitErrorModel, GilbertElliottModel
 
-def compare_protocols():
+# Протоколы со скользящим окном, сравниваемые в анализах
+PROTOCOLS = [('Go-Back-N', "go_back_n"), ('Selective Repeat', "selective_repeat")]
+
+def compare_protocols(clock="virtual", workers=None, cache=None):
     # Данные для тестирования с разными размерами
     test_cases = [
         "HelloWorld",
@@ -27,60 +36,38 @@ def compare_protocols():
     print("СРАВНЕНИЕ ПРОТОКОЛОВ ПЕРЕДАЧИ ДАННЫХ")
     print("=" * 80)
     
-    for i, test_data in enumerate(test_cases):
-        data_size = len(test_data)
+    # Все прогоны считаются параллельно, результаты приходят в порядке точек
+    protocols = [
+        ('Stop-and-Wait', "stop_and_wait", 1),
+        ('Go-Back-N', "go_back_n", 4),
+        ('Selective Repeat', "selective_repeat", 4)
+    ]
+    points = [
+        {'data': test_data, 'protocol_type': protocol_type, 'window_size': window_size}
+        for test_data in test_cases
+        for _, protocol_type, window_size in protocols
+    ]
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        package_data_size=2,
+        packet_loss_prob=0.1,
+        corruption_prob=0.1,
+        ack_loss_prob=0.1,
+        timeout=0.3,
+        clock=clock
+    )
+    
+    for i, data_size in enumerate(data_sizes):
         print(f"\nТестирование с размером данных: {data_size} символов")
         print("-" * 50)
         
-        # Stop-and-Wait (окно=1)
-        simulator_sw = ProtocolSimulator(
-            test_data, 
-            window_size=1,
-            protocol_type="stop_and_wait",
-            package_data_size=2,
-            packet_loss_prob=0.1,
-            corruption_prob=0.1,
-            ack_loss_prob=0.1,
-            timeout=0.3
-        )
-        simulator_sw.run_simulation()
-        results['Stop-and-Wait']['time'].append(simulator_sw.stats['total_time'])
-        results['Stop-and-Wait']['efficiency'].append(simulator_sw.stats.get('efficiency', 0))
-        
-        # Go-Back-N (окно=4)
-        simulator_gbn = ProtocolSimulator(
-            test_data,
-            window_size=4,
-            protocol_type="go_back_n",
-            package_data_size=2,
-            packet_loss_prob=0.1,
-            corruption_prob=0.1,
-            ack_loss_prob=0.1,
-            timeout=0.3
-        )
-        simulator_gbn.run_simulation()
-        results['Go-Back-N']['time'].append(simulator_gbn.stats['total_time'])
-        results['Go-Back-N']['efficiency'].append(simulator_gbn.stats.get('efficiency', 0))
-        
-        # Selective Repeat (окно=4)
-        simulator_sr = ProtocolSimulator(
-            test_data,
-            window_size=4,
-            protocol_type="selective_repeat",
-            package_data_size=2,
-            packet_loss_prob=0.1,
-            corruption_prob=0.1,
-            ack_loss_prob=0.1,
-            timeout=0.3
-        )
-        simulator_sr.run_simulation()
-        results['Selective Repeat']['time'].append(simulator_sr.stats['total_time'])
-        results['Selective Repeat']['efficiency'].append(simulator_sr.stats.get('efficiency', 0))
-        
-        # Вывод результатов для текущего размера данных
-        print(f"Stop-and-Wait:     {simulator_sw.stats['total_time']:.2f} сек")
-        print(f"Go-Back-N:         {simulator_gbn.stats['total_time']:.2f} сек")
-        print(f"Selective Repeat:  {simulator_sr.stats['total_time']:.2f} сек")
+        for j, (name, _, _) in enumerate(protocols):
+            row = rows[i * len(protocols) + j]
+            results[name]['time'].append(row['total_time'])
+            results[name]['efficiency'].append(row['efficiency'])
+            print(f"{name + ':':<19}{row['total_time']:.2f} сек")
     
     # Вывод сводной таблицы
     print("\n" + "=" * 80)
@@ -102,17 +89,95 @@ def compare_protocols():
     plot_results(data_sizes, results)
     
     # Дополнительные анализы
-    analyze_packet_loss_dependency()
-    analyze_window_size_dependency()
+    analyze_packet_loss_dependency(clock, workers=workers, cache=cache)
+    analyze_window_size_dependency(clock, workers=workers, cache=cache)
+    analyze_bandwidth_delay_product(workers=workers, cache=cache)
+    analyze_error_models(workers=workers, cache=cache)
+    analyze_timeout_policy(workers=workers, cache=cache)
+    analyze_fast_retransmit(workers=workers, cache=cache)
+    analyze_ack_modes(workers=workers, cache=cache)
+    analyze_congestion_control(workers=workers, cache=cache)
+    analyze_multiflow()
+    analyze_analytic_model(workers=workers, cache=cache)
 
-def analyze_packet_loss_dependency():
+def measure_points(test_data, points, timeout, clock="virtual", engine="simulator", replications=1000,
+                   workers=None, cache=None, target_width=0.05):
+    """Коэффициент k и время передачи (с доверительными интервалами) для точек графика"""
+    if engine == "analytic":
+        # Формулы analytic.py: без моделирования, микросекунды на точку
+        measurements = []
+        for point in points:
+            estimate = expected_performance(
+                point['protocol_type'],
+                len(test_data),
+                window_size=point['window_size'],
+                package_data_size=2,
+                packet_loss_prob=point['packet_loss_prob'],
+                corruption_prob=0.0,
+                ack_loss_prob=0.0,
+                timeout=timeout
+            )
+            measurements.append((estimate['k'], estimate['total_time'], 0.0, 0.0))
+        return measurements
+    
+    if engine == "montecarlo":
+        measurements = []
+        for point in points:
+            batch = simulate_batch(
+                point['protocol_type'],
+                len(test_data),
+                window_size=point['window_size'],
+                package_data_size=2,
+                packet_loss_prob=point['packet_loss_prob'],
+                corruption_prob=0.0,
+                ack_loss_prob=0.0,
+                timeout=timeout,
+                replications=replications
+            )
+            measurements.append((batch['k'], batch['total_time'], batch['k_ci'], batch['total_time_ci']))
+        return measurements
+    
+    if clock == "virtual":
+        # Повторы точки до доверительного интервала k и t не шире target_width от среднего
+        # (не больше replications прогонов): шумные точки получают больше прогонов
+        rows = run_replicated(
+            points,
+            metrics=('k', 'total_time'),
+            target_width=target_width,
+            max_replications=replications,
+            workers=workers,
+            cache=cache,
+            data=test_data,
+            package_data_size=2,
+            corruption_prob=0.0,
+            ack_loss_prob=0.0,
+            timeout=timeout,
+            clock=clock
+        )
+        return [(row['k'], row['total_time'], row['k_ci'], row['total_time_ci']) for row in rows]
+    
+    # На реальных часах прогон долгий - одна передача на точку
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        package_data_size=2,
+        corruption_prob=0.0,
+        ack_loss_prob=0.0,
+        timeout=timeout,
+        clock=clock
+    )
+    return [(row['k'], row['total_time'], 0.0, 0.0) for row in rows]
+
+def analyze_packet_loss_dependency(clock="virtual", engine="simulator", replications=1000, workers=None, cache=None):
     """Анализ зависимости эффективности от вероятности потери пакетов"""
     print("\n" + "=" * 80)
     print("АНАЛИЗ ЗАВИСИМОСТИ ОТ ВЕРОЯТНОСТИ ПОТЕРИ ПАКЕТОВ")
     print("=" * 80)
     
     # Фиксированные параметры
-    test_data = "HelloWorld" * 18  # 198 символов ≈ 100 пакетов
+    test_data = "HelloWorld" * 18  # 180 символов = 90 пакетов
     window_size = 3
     timeout = 0.2
     
@@ -120,66 +185,46 @@ def analyze_packet_loss_dependency():
     loss_probabilities = [0.0, 0.1, 0.2, 0.3, 0.5, 0.6]
     
     results_loss = {
-        'Go-Back-N': {'k': [], 't': []},
-        'Selective Repeat': {'k': [], 't': []}
+        'Go-Back-N': {'k': [], 't': [], 'k_ci': [], 't_ci': []},
+        'Selective Repeat': {'k': [], 't': [], 'k_ci': [], 't_ci': []}
     }
     
     print(f"{'Вероятность':<12} {'Go-Back-N':<20} {'Selective Repeat':<20}")
     print(f"{'потерь (p)':<12} {'k':<10} {'t':<10} {'k':<10} {'t':<10}")
     print("-" * 60)
     
-    for p in loss_probabilities:
-        # Go-Back-N
-        simulator_gbn = ProtocolSimulator(
-            test_data,
-            window_size=window_size,
-            protocol_type="go_back_n",
-            package_data_size=2,
-            packet_loss_prob=p,
-            corruption_prob=0.0,
-            ack_loss_prob=0.0,
-            timeout=timeout
-        )
-        simulator_gbn.run_simulation()
-        
-        # Selective Repeat
-        simulator_sr = ProtocolSimulator(
-            test_data,
-            window_size=window_size,
-            protocol_type="selective_repeat",
-            package_data_size=2,
-            packet_loss_prob=p,
-            corruption_prob=0.0,
-            ack_loss_prob=0.0,
-            timeout=timeout
-        )
-        simulator_sr.run_simulation()
-        
-        # Расчет коэффициента эффективности k
-        useful_packets = len(test_data) // 2
-        k_gbn = simulator_gbn.stats['total_sent'] / useful_packets
-        k_sr = simulator_sr.stats['total_sent'] / useful_packets
-        
-        results_loss['Go-Back-N']['k'].append(k_gbn)
-        results_loss['Go-Back-N']['t'].append(simulator_gbn.stats['total_time'])
-        results_loss['Selective Repeat']['k'].append(k_sr)
-        results_loss['Selective Repeat']['t'].append(simulator_sr.stats['total_time'])
+    points = [
+        {'protocol_type': protocol_type, 'window_size': window_size, 'packet_loss_prob': p}
+        for p in loss_probabilities
+        for _, protocol_type in PROTOCOLS
+    ]
+    measurements = measure_points(test_data, points, timeout, clock, engine, replications, workers, cache)
+    
+    for i, p in enumerate(loss_probabilities):
+        row = []
+        for j, (name, _) in enumerate(PROTOCOLS):
+            k, t, k_ci, t_ci = measurements[i * len(PROTOCOLS) + j]
+            results_loss[name]['k'].append(k)
+            results_loss[name]['t'].append(t)
+            results_loss[name]['k_ci'].append(k_ci)
+            results_loss[name]['t_ci'].append(t_ci)
+            row.append(f"{k:<10.2f} {t:<10.2f}")
         
-        print(f"{p:<12.1f} {k_gbn:<10.2f} {simulator_gbn.stats['total_time']:<10.2f} {k_sr:<10.2f} {simulator_sr.stats['total_time']:<10.2f}")
+        print(f"{p:<12.1f} {' '.join(row)}")
     
     # Построение графиков для анализа потерь
     plot_loss_analysis(loss_probabilities, results_loss)
     
     return results_loss
 
-def analyze_window_size_dependency():
+def analyze_window_size_dependency(clock="virtual", engine="simulator", replications=1000, workers=None, cache=None):
     """Анализ зависимости эффективности от размера окна"""
     print("\n" + "=" * 80)
     print("АНАЛИЗ ЗАВИСИМОСТИ ОТ РАЗМЕРА ОКНА")
     print("=" * 80)
     
     # Фиксированные параметры
-    test_data = "HelloWorld" * 18  # 198 символов ≈ 100 пакетов
+    test_data = "HelloWorld" * 18  # 180 символов = 90 пакетов
     packet_loss_prob = 0.3
     timeout = 0.2
     
@@ -187,65 +232,486 @@ def analyze_window_size_dependency():
     window_sizes = [2, 3, 4, 5, 6, 7, 8, 9, 10]
     
     results_window = {
-        'Go-Back-N': {'k': [], 't': []},
-        'Selective Repeat': {'k': [], 't': []}
+        'Go-Back-N': {'k': [], 't': [], 'k_ci': [], 't_ci': []},
+        'Selective Repeat': {'k': [], 't': [], 'k_ci': [], 't_ci': []}
     }
     
     print(f"{'Размер':<8} {'Go-Back-N':<20} {'Selective Repeat':<20}")
     print(f"{'окна':<8} {'k':<10} {'t':<10} {'k':<10} {'t':<10}")
     print("-" * 60)
     
-    for window_size in window_sizes:
-        # Go-Back-N
-        simulator_gbn = ProtocolSimulator(
-            test_data,
-            window_size=window_size,
-            protocol_type="go_back_n",
-            package_data_size=2,
-            packet_loss_prob=packet_loss_prob,
-            corruption_prob=0.0,
-            ack_loss_prob=0.0,
-            timeout=timeout
-        )
-        simulator_gbn.run_simulation()
-        
-        # Selective Repeat
-        simulator_sr = ProtocolSimulator(
-            test_data,
-            window_size=window_size,
-            protocol_type="selective_repeat",
-            package_data_size=2,
-            packet_loss_prob=packet_loss_prob,
-            corruption_prob=0.0,
-            ack_loss_prob=0.0,
-            timeout=timeout
-        )
-        simulator_sr.run_simulation()
-        
-        # Расчет коэффициента эффективности k
-        useful_packets = len(test_data) // 2
-        k_gbn = simulator_gbn.stats['total_sent'] / useful_packets
-        k_sr = simulator_sr.stats['total_sent'] / useful_packets
-        
-        results_window['Go-Back-N']['k'].append(k_gbn)
-        results_window['Go-Back-N']['t'].append(simulator_gbn.stats['total_time'])
-        results_window['Selective Repeat']['k'].append(k_sr)
-        results_window['Selective Repeat']['t'].append(simulator_sr.stats['total_time'])
+    points = [
+        {'protocol_type': protocol_type, 'window_size': window_size, 'packet_loss_prob': packet_loss_prob}
+        for window_size in window_sizes
+        for _, protocol_type in PROTOCOLS
+    ]
+    measurements = measure_points(test_data, points, timeout, clock, engine, replications, workers, cache)
+    
+    for i, window_size in enumerate(window_sizes):
+        row = []
+        for j, (name, _) in enumerate(PROTOCOLS):
+            k, t, k_ci, t_ci = measurements[i * len(PROTOCOLS) + j]
+            results_window[name]['k'].append(k)
+            results_window[name]['t'].append(t)
+            results_window[name]['k_ci'].append(k_ci)
+            results_window[name]['t_ci'].append(t_ci)
+            row.append(f"{k:<10.2f} {t:<10.2f}")
         
-        print(f"{window_size:<8} {k_gbn:<10.2f} {simulator_gbn.stats['total_time']:<10.2f} {k_sr:<10.2f} {simulator_sr.stats['total_time']:<10.2f}")
+        print(f"{window_size:<8} {' '.join(row)}")
     
     # Построение графиков для анализа размера окна
     plot_window_analysis(window_sizes, results_window)
     
     return results_window
 
+def analyze_bandwidth_delay_product(workers=None, cache=None):
+    """Анализ пропускной способности от размера окна на канале с задержкой и ограниченной полосой"""
+    print("\n" + "=" * 80)
+    print("АНАЛИЗ ПРОПУСКНОЙ СПОСОБНОСТИ ОТ РАЗМЕРА ОКНА (ПРОИЗВЕДЕНИЕ ПОЛОСА x ЗАДЕРЖКА)")
+    print("=" * 80)
+    
+    # Фиксированные параметры канала
+    test_data = "HelloWorld" * 10000  # 100 000 байт = 100 пакетов
+    package_data_size = 1000
+    bandwidth = 8e6  # 8 Мбит/с
+    propagation_delay = 0.01  # 10 мс в одну сторону
+    queue_capacity = 20
+    
+    # Сколько пакетов помещается в канал за время RTT
+    rtt = 2 * propagation_delay + package_data_size * 8 / bandwidth
+    bdp_packets = bandwidth * rtt / (package_data_size * 8)
+    print(f"RTT = {rtt * 1000:.1f} мс, произведение полоса x задержка = {bdp_packets:.1f} пакетов")
+    
+    window_sizes = [1, 2, 4, 8, 12, 16, 20, 24, 32, 48]
+    
+    results_bdp = {name: {'throughput': []} for name, _ in PROTOCOLS}
+    
+    rows = run_sweep(
+        {'window_size': window_sizes, 'protocol_type': [protocol_type for _, protocol_type in PROTOCOLS]},
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        package_data_size=package_data_size,
+        packet_loss_prob=0.0,
+        corruption_prob=0.0,
+        ack_loss_prob=0.0,
+        timeout=0.2,
+        propagation_delay=propagation_delay,
+        bandwidth=bandwidth,
+        queue_capacity=queue_capacity
+    )
+    
+    print(f"{'Размер':<8} {'Go-Back-N':<15} {'Selective Repeat':<15}")
+    print(f"{'окна':<8} {'Мбит/с':<15} {'Мбит/с':<15}")
+    print("-" * 40)
+    
+    for i, window_size in enumerate(window_sizes):
+        row = []
+        for j, (name, _) in enumerate(PROTOCOLS):
+            result = rows[i * len(PROTOCOLS) + j]
+            throughput = len(test_data) * 8 / result['total_time'] / 1e6
+            results_bdp[name]['throughput'].append(throughput)
+            row.append(f"{throughput:<15.2f}")
+        print(f"{window_size:<8} {' '.join(row)}")
+    
+    plot_bdp_analysis(window_sizes, results_bdp, bdp_packets, bandwidth)
+    
+    return results_bdp
+
+def analyze_error_models(workers=None, cache=None):
+    """Сравнение независимых битовых ошибок и пакетированных ошибок Гилберта-Эллиотта"""
+    print("\n" + "=" * 80)
+    print("АНАЛИЗ ВЛИЯНИЯ МОДЕЛИ ОШИБОК (НЕЗАВИСИМЫЕ vs ПАКЕТИРОВАННЫЕ)")
+    print("=" * 80)
+    
+    # Фиксированные параметры
+    test_data = "HelloWorld" * 2000  # 20 000 байт = 200 пакетов по 100 байт
+    window_size = 8
+    timeout = 0.2
+    
+    # Средний BER одинаков, различается только группировка ошибок
+    bit_error_rates = [1e-5, 1e-4, 5e-4, 1e-3]
+    models = {
+        'Независимые': lambda ber: BitErrorModel(ber),
+        'Гилберт-Эллиотт': lambda ber: GilbertElliottModel(1e-4, 1e-2, 0.0, ber * 101)
+    }
+    
+    points = [
+        {'protocol_type': protocol_type, 'error_model': make_model(ber)}
+        for ber in bit_error_rates
+        for make_model in models.values()
+        for _, protocol_type in PROTOCOLS
+    ]
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        window_size=window_size,
+        package_data_size=100,
+        packet_loss_prob=0.0,
+        ack_loss_prob=0.0,
+        timeout=timeout
+    )
+    
+    print(f"{'BER':<10} {'Модель':<18} {'Go-Back-N k':<15} {'Selective Repeat k':<15}")
+    print("-" * 60)
+    index = 0
+    for ber in bit_error_rates:
+        for model_name in models:
+            k_values = []
+            for _ in PROTOCOLS:
+                k_values.append(rows[index]['k'])
+                index += 1
+            print(f"{ber:<10.0e} {model_name:<18} {k_values[0]:<15.2f} {k_values[1]:<15.2f}")
+    
+    return rows
+
+def analyze_timeout_policy(workers=None, replications=20, cache=None):
+    """Сравнение фиксированного таймаута с адаптивным (оценка RTT по Jacobson/Karels)"""
+    print("\n" + "=" * 80)
+    print("АНАЛИЗ ПОЛИТИКИ ТАЙМАУТА (ФИКСИРОВАННЫЙ vs АДАПТИВНЫЙ)")
+    print("=" * 80)
+    
+    # Фиксированные параметры - как в анализе потерь; RTT канала 1 мс
+    test_data = "HelloWorld" * 18  # 180 символов = 90 пакетов
+    window_size = 3
+    loss_probabilities = [0.1, 0.3, 0.5]
+    # Подобранный вручную таймаут и заведомо меньший RTT
+    timeouts = [0.2, 0.0005]
+    policies = ["fixed", "adaptive"]
+    
+    points = [
+        {'protocol_type': protocol_type, 'packet_loss_prob': p, 'timeout': timeout, 'timeout_policy': policy}
+        for timeout in timeouts
+        for p in loss_probabilities
+        for _, protocol_type in PROTOCOLS
+        for policy in policies
+        for _ in range(replications)
+    ]
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        window_size=window_size,
+        package_data_size=2,
+        corruption_prob=0.0,
+        ack_loss_prob=0.0
+    )
+    
+    print(f"{'Таймаут':<9} {'p':<6} {'Протокол':<18} {'Повторы':<20} {'Время, с':<20}")
+    print(f"{'':<9} {'':<6} {'':<18} {'фикс.':<10}{'адапт.':<10} {'фикс.':<10}{'адапт.':<10}")
+    print("-" * 75)
+    
+    results = {}
+    index = 0
+    for timeout in timeouts:
+        for p in loss_probabilities:
+            for name, _ in PROTOCOLS:
+                means = {}
+                for policy in policies:
+                    batch = rows[index:index + replications]
+                    index += replications
+                    means[policy] = (sum(row['retransmissions'] for row in batch) / replications,
+                                     sum(row['total_time'] for row in batch) / replications)
+                results[(timeout, p, name)] = means
+                retransmissions = ''.join(f"{means[policy][0]:<10.1f}" for policy in policies)
+                times = ''.join(f"{means[policy][1]:<10.3f}" for policy in policies)
+                print(f"{timeout:<9g} {p:<6.1f} {name:<18} {retransmissions} {times}")
+    
+    return results
+
+def analyze_fast_retransmit(workers=None, replications=50, cache=None):
+    """Go-Back-N с быстрой повторной передачей по дубликатам ACK и без нее"""
+    print("\n" + "=" * 80)
+    print("АНАЛИЗ БЫСТРОЙ ПОВТОРНОЙ ПЕРЕДАЧИ (GO-BACK-N, 3 ДУБЛИКАТА ACK)")
+    print("=" * 80)
+    
+    # Фиксированные параметры; порог должен быть меньше окна,
+    # иначе после потери не наберется достаточно дубликатов
+    test_data = "HelloWorld" * 18  # 180 символов = 90 пакетов
+    window_size = 8
+    timeout = 0.2
+    loss_probabilities = [0.05, 0.1, 0.2, 0.3]
+    thresholds = [None, 3]
+    
+    points = [
+        {'packet_loss_prob': p, 'dup_ack_threshold': threshold}
+        for p in loss_probabilities
+        for threshold in thresholds
+        for _ in range(replications)
+    ]
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        protocol_type="go_back_n",
+        window_size=window_size,
+        package_data_size=2,
+        corruption_prob=0.0,
+        ack_loss_prob=0.0,
+        timeout=timeout
+    )
+    
+    print(f"{'p':<6} {'Режим':<16} {'Время, с':<10} {'95% время':<11} {'Повторы':<10} {'Быстрые':<10}")
+    print("-" * 65)
+    
+    results = {}
+    index = 0
+    for p in loss_probabilities:
+        for threshold in thresholds:
+            batch = rows[index:index + replications]
+            index += replications
+            times = sorted(row['total_time'] for row in batch)
+            mean_time = sum(times) / replications
+            tail_time = times[int(0.95 * (replications - 1))]
+            retransmissions = sum(row['retransmissions'] for row in batch) / replications
+            fast = sum(row['fast_retransmits'] for row in batch) / replications
+            mode = "только таймер" if threshold is None else f"{threshold} дубликата"
+            results[(p, threshold)] = {'time': mean_time, 'tail_time': tail_time, 'retransmissions': retransmissions}
+            print(f"{p:<6.2f} {mode:<16} {mean_time:<10.3f} {tail_time:<11.3f} {retransmissions:<10.1f} {fast:<10.1f}")
+    
+    return results
+
+def analyze_ack_modes(workers=None, replications=30, cache=None):
+    """Selective Repeat: поштучные ACK, SACK и отложенные SACK при потерях подтверждений"""
+    print("\n" + "=" * 80)
+    print("АНАЛИЗ РЕЖИМОВ ПОДТВЕРЖДЕНИЯ (SELECTIVE REPEAT)")
+    print("=" * 80)
+    
+    # Фиксированные параметры
+    test_data = "HelloWorld" * 18  # 180 символов = 90 пакетов
+    window_size = 8
+    timeout = 0.2
+    ack_loss_probabilities = [0.0, 0.1, 0.3]
+    modes = [
+        ('Поштучные ACK', {}),
+        ('SACK', {'sack': True}),
+        ('SACK каждые 2', {'ack_every': 2, 'ack_delay': 0.002}),
+        ('SACK каждые 4', {'ack_every': 4, 'ack_delay': 0.002})
+    ]
+    
+    points = [
+        dict(mode, ack_loss_prob=ack_loss)
+        for ack_loss in ack_loss_probabilities
+        for _, mode in modes
+        for _ in range(replications)
+    ]
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        protocol_type="selective_repeat",
+        window_size=window_size,
+        package_data_size=2,
+        packet_loss_prob=0.1,
+        corruption_prob=0.0,
+        timeout=timeout
+    )
+    
+    print(f"{'Потери ACK':<12} {'Режим':<16} {'ACK':<10} {'Повторы':<10} {'Время, с':<10}")
+    print("-" * 60)
+    
+    results = {}
+    index = 0
+    for ack_loss in ack_loss_probabilities:
+        for mode_name, _ in modes:
+            batch = rows[index:index + replications]
+            index += replications
+            means = {key: sum(row[key] for row in batch) / replications
+                     for key in ('acks_sent', 'retransmissions', 'total_time')}
+            results[(ack_loss, mode_name)] = means
+            print(f"{ack_loss:<12.1f} {mode_name:<16} {means['acks_sent']:<10.1f} "
+                  f"{means['retransmissions']:<10.1f} {means['total_time']:<10.3f}")
+    
+    return results
+
+def analyze_congestion_control(workers=None, cache=None):
+    """Фиксированные окна против окна перегрузки Reno/CUBIC на канале с ограниченной очередью"""
+    print("\n" + "=" * 80)
+    print("АНАЛИЗ УПРАВЛЕНИЯ ПЕРЕГРУЗКОЙ (ФИКСИРОВАННОЕ ОКНО vs RENO/CUBIC)")
+    print("=" * 80)
+    
+    # Канал из анализа полоса x задержка, но передача длиннее - окну есть где вырасти
+    test_data = "HelloWorld" * 100000  # 1 000 000 байт = 1000 пакетов
+    package_data_size = 1000
+    bandwidth = 8e6  # 8 Мбит/с
+    propagation_delay = 0.01  # 10 мс в одну сторону
+    queue_capacity = 20
+    max_window = 64
+    
+    modes = [(f"окно {window_size}", {'window_size': window_size}) for window_size in [8, 16, 24, 32, max_window]]
+    modes += [
+        ('Reno', {'window_size': max_window, 'congestion': "reno"}),
+        ('CUBIC', {'window_size': max_window, 'congestion': "cubic"})
+    ]
+    
+    points = [
+        dict(mode, protocol_type=protocol_type)
+        for _, protocol_type in PROTOCOLS
+        for _, mode in modes
+    ]
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        package_data_size=package_data_size,
+        packet_loss_prob=0.0,
+        corruption_prob=0.0,
+        ack_loss_prob=0.0,
+        timeout=0.2,
+        propagation_delay=propagation_delay,
+        bandwidth=bandwidth,
+        queue_capacity=queue_capacity,
+        dup_ack_threshold=3
+    )
+    
+    print(f"{'Протокол':<18} {'Режим':<10} {'Мбит/с':<10} {'Повторы':<10} {'Потери в очереди':<10}")
+    print("-" * 65)
+    
+    results = {}
+    index = 0
+    for name, _ in PROTOCOLS:
+        for mode_name, _ in modes:
+            row = rows[index]
+            index += 1
+            throughput = len(test_data) * 8 / row['total_time'] / 1e6
+            results[(name, mode_name)] = {'throughput': throughput, 'cwnd': row['cwnd']}
+            print(f"{name:<18} {mode_name:<10} {throughput:<10.2f} {row['retransmissions']:<10} "
+                  f"{row['queue_drops']:<10}")
+    
+    # Окно, которое канал вмещает без потерь: полоса x задержка плюс очередь
+    rtt = 2 * propagation_delay + package_data_size * 8 / bandwidth
+    pipe_packets = bandwidth * rtt / (package_data_size * 8) + queue_capacity
+    plot_cwnd_trajectories(results, pipe_packets)
+    
+    return results
+
+def analyze_multiflow():
+    """Несколько одновременных передач разных протоколов на общем узком канале"""
+    print("\n" + "=" * 80)
+    print("АНАЛИЗ СОВМЕСТНОЙ РАБОТЫ ПОТОКОВ НА ОБЩЕМ КАНАЛЕ")
+    print("=" * 80)
+    
+    # Общий канал: 8 Мбит/с, 10 мс, очередь на 50 пакетов, 1% потерь
+    test_data = "HelloWorld" * 10000  # 100 000 байт = 100 пакетов на поток
+    flow_counts = [3, 12, 48, 192]
+    protocols = [
+        ('Stop-and-Wait', "stop_and_wait", 1),
+        ('Go-Back-N', "go_back_n", 8),
+        ('Selective Repeat', "selective_repeat", 8)
+    ]
+    
+    print(f"{'Потоков':<9} {'Всего, Мбит/с':<15} {'Джейн':<8} "
+          + ''.join(f"{name + ', Мбит/с':<26}" for name, _, _ in protocols))
+    print("-" * 110)
+    
+    results = {}
+    for count in flow_counts:
+        flows = [
+            {'data': test_data, 'protocol_type': protocols[i % len(protocols)][1],
+             'window_size': protocols[i % len(protocols)][2]}
+            for i in range(count)
+        ]
+        simulator = MultiFlowSimulator(
+            flows,
+            package_data_size=1000,
+            packet_loss_prob=0.01,
+            ack_loss_prob=0.0,
+            corruption_prob=0.0,
+            propagation_delay=0.01,
+            bandwidth=8e6,
+            queue_capacity=50,
+            timeout=0.2,
+            dup_ack_threshold=3,
+            seed=count
+        )
+        simulator.run_simulation()
+        stats = simulator.stats
+        
+        # Средняя скорость потока каждого протокола
+        per_protocol = []
+        for i in range(len(protocols)):
+            throughputs = [flow['throughput'] for flow in stats['flows'][i::len(protocols)]]
+            per_protocol.append(sum(throughputs) / len(throughputs) / 1e6 if throughputs else 0.0)
+        results[count] = {'goodput': stats['aggregate_goodput'], 'fairness': stats['fairness'],
+                          'per_protocol': per_protocol}
+        print(f"{count:<9} {stats['aggregate_goodput'] / 1e6:<15.2f} {stats['fairness']:<8.3f} "
+              + ''.join(f"{value:<26.3f}" for value in per_protocol))
+    
+    return results
+
+def analyze_analytic_model(workers=None, replications=30, cache=None):
+    """Сравнение аналитической модели (analytic.py) с моделированием"""
+    print("\n" + "=" * 80)
+    print("АНАЛИТИЧЕСКАЯ МОДЕЛЬ ПРОТИВ МОДЕЛИРОВАНИЯ")
+    print("=" * 80)
+    
+    # Те же условия, что в анализе потерь, но с потерями ACK и порчей
+    test_data = "HelloWorld" * 18  # 180 символов = 90 пакетов
+    timeout = 0.2
+    ack_loss_prob = 0.1
+    corruption_prob = 0.05
+    loss_probabilities = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+    protocols = [
+        ('Stop-and-Wait', "stop_and_wait", 1),
+        ('Go-Back-N', "go_back_n", 4),
+        ('Selective Repeat', "selective_repeat", 4)
+    ]
+    
+    points = [
+        {'protocol_type': protocol_type, 'window_size': window_size, 'packet_loss_prob': p,
+         'replication': replication}
+        for _, protocol_type, window_size in protocols
+        for p in loss_probabilities
+        for replication in range(replications)
+    ]
+    rows = run_sweep(
+        points,
+        workers=workers,
+        cache=cache,
+        data=test_data,
+        package_data_size=2,
+        ack_loss_prob=ack_loss_prob,
+        corruption_prob=corruption_prob,
+        timeout=timeout
+    )
+    
+    print(f"{'Протокол':<18} {'p':<6} {'k модель':<10} {'k опыт':<10} {'t модель':<10} {'t опыт':<10}")
+    print("-" * 66)
+    
+    results = {}
+    for i, (name, protocol_type, window_size) in enumerate(protocols):
+        results[name] = {'k': [], 't': [], 'k_model': [], 't_model': []}
+        for j, p in enumerate(loss_probabilities):
+            start = (i * len(loss_probabilities) + j) * replications
+            point_rows = rows[start:start + replications]
+            k = sum(row['k'] for row in point_rows) / replications
+            t = sum(row['total_time'] for row in point_rows) / replications
+            estimate = expected_performance(protocol_type, len(test_data), window_size, 2, p, ack_loss_prob,
+                                            corruption_prob, timeout)
+            results[name]['k'].append(k)
+            results[name]['t'].append(t)
+            results[name]['k_model'].append(estimate['k'])
+            results[name]['t_model'].append(estimate['total_time'])
+            print(f"{name:<18} {p:<6.1f} {estimate['k']:<10.2f} {k:<10.2f} "
+                  f"{estimate['total_time']:<10.2f} {t:<10.2f}")
+    
+    plot_analytic_comparison(loss_probabilities, results)
+    
+    return results
+
 def plot_loss_analysis(loss_probabilities, results):
     """Построение графиков для анализа зависимости от потерь"""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
     
     # График коэффициента эффективности k
-    ax1.plot(loss_probabilities, results['Go-Back-N']['k'], 'o-', label='Go-Back-N', linewidth=2)
-    ax1.plot(loss_probabilities, results['Selective Repeat']['k'], 'o-', label='Selective Repeat', linewidth=2)
+    ax1.errorbar(loss_probabilities, results['Go-Back-N']['k'], yerr=results['Go-Back-N'].get('k_ci'), fmt='o-', label='Go-Back-N', linewidth=2, capsize=4)
+    ax1.errorbar(loss_probabilities, results['Selective Repeat']['k'], yerr=results['Selective Repeat'].get('k_ci'), fmt='o-', label='Selective Repeat', linewidth=2, capsize=4)
     ax1.set_xlabel('Вероятность потери пакета (p)')
     ax1.set_ylabel('Коэффициент эффективности (k)')
     ax1.set_title('Зависимость коэффициента эффективности от вероятности потерь\n(окно=3)')
@@ -253,8 +719,8 @@ def plot_loss_analysis(loss_probabilities, results):
     ax1.grid(True, alpha=0.3)
     
     # График времени передачи t
-    ax2.plot(loss_probabilities, results['Go-Back-N']['t'], 'o-', label='Go-Back-N', linewidth=2)
-    ax2.plot(loss_probabilities, results['Selective Repeat']['t'], 'o-', label='Selective Repeat', linewidth=2)
+    ax2.errorbar(loss_probabilities, results['Go-Back-N']['t'], yerr=results['Go-Back-N'].get('t_ci'), fmt='o-', label='Go-Back-N', linewidth=2, capsize=4)
+    ax2.errorbar(loss_probabilities, results['Selective Repeat']['t'], yerr=results['Selective Repeat'].get('t_ci'), fmt='o-', label='Selective Repeat', linewidth=2, capsize=4)
     ax2.set_xlabel('Вероятность потери пакета (p)')
     ax2.set_ylabel('Время передачи (t), сек')
     ax2.set_title('Зависимость времени передачи от вероятности потерь\n(окно=3)')
@@ -269,8 +735,8 @@ def plot_window_analysis(window_sizes, results):
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
     
     # График коэффициента эффективности k
-    ax1.plot(window_sizes, results['Go-Back-N']['k'], 'o-', label='Go-Back-N', linewidth=2)
-    ax1.plot(window_sizes, results['Selective Repeat']['k'], 'o-', label='Selective Repeat', linewidth=2)
+    ax1.errorbar(window_sizes, results['Go-Back-N']['k'], yerr=results['Go-Back-N'].get('k_ci'), fmt='o-', label='Go-Back-N', linewidth=2, capsize=4)
+    ax1.errorbar(window_sizes, results['Selective Repeat']['k'], yerr=results['Selective Repeat'].get('k_ci'), fmt='o-', label='Selective Repeat', linewidth=2, capsize=4)
     ax1.set_xlabel('Размер окна')
     ax1.set_ylabel('Коэффициент эффективности (k)')
     ax1.set_title('Зависимость коэффициента эффективности от размера окна\n(p=0.3)')
@@ -278,8 +744,8 @@ def plot_window_analysis(window_sizes, results):
     ax1.grid(True, alpha=0.3)
     
     # График времени передачи t
-    ax2.plot(window_sizes, results['Go-Back-N']['t'], 'o-', label='Go-Back-N', linewidth=2)
-    ax2.plot(window_sizes, results['Selective Repeat']['t'], 'o-', label='Selective Repeat', linewidth=2)
+    ax2.errorbar(window_sizes, results['Go-Back-N']['t'], yerr=results['Go-Back-N'].get('t_ci'), fmt='o-', label='Go-Back-N', linewidth=2, capsize=4)
+    ax2.errorbar(window_sizes, results['Selective Repeat']['t'], yerr=results['Selective Repeat'].get('t_ci'), fmt='o-', label='Selective Repeat', linewidth=2, capsize=4)
     ax2.set_xlabel('Размер окна')
     ax2.set_ylabel('Время передачи (t), сек')
     ax2.set_title('Зависимость времени передачи от размера окна\n(p=0.3)')
@@ -323,6 +789,69 @@ def plot_window_analysis(window_sizes, results):
     print(f"\nРезультаты экспортированы в файл: {filename}")
     print(f"Полный путь: {os.path.abspath(filename)}")
 """
+def plot_bdp_analysis(window_sizes, results, bdp_packets, bandwidth):
+    """Построение графика пропускной способности от размера окна"""
+    plt.figure(figsize=(12, 7))
+    
+    for name, values in results.items():
+        plt.plot(window_sizes, values['throughput'], 'o-', label=name, linewidth=2, markersize=8)
+    
+    plt.axvline(bdp_packets, color='gray', linestyle='--', label=f'Полоса x задержка ({bdp_packets:.1f} пакетов)')
+    plt.axhline(bandwidth / 1e6, color='gray', linestyle=':', label='Пропускная способность канала')
+    plt.xlabel('Размер окна (пакетов)')
+    plt.ylabel('Полезная скорость, Мбит/с')
+    plt.title('Зависимость скорости передачи от размера окна')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    plt.show()
+
+def plot_cwnd_trajectories(results, pipe_packets):
+    """Построение траекторий окна перегрузки во времени"""
+    plt.figure(figsize=(12, 7))
+    
+    for (name, mode_name), values in results.items():
+        if values['cwnd']:
+            times, windows = zip(*values['cwnd'])
+            plt.step(times, windows, where='post', label=f'{name}, {mode_name}', linewidth=2)
+    
+    plt.axhline(pipe_packets, color='gray', linestyle='--',
+                label=f'Полоса x задержка + очередь ({pipe_packets:.0f} пакетов)')
+    plt.xlabel('Время, с')
+    plt.ylabel('Окно перегрузки (пакетов)')
+    plt.title('Изменение окна перегрузки во времени')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    plt.show()
+
+def plot_analytic_comparison(loss_probabilities, results):
+    """Модель - линии, моделирование - точки того же цвета"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    
+    for name, values in results.items():
+        line, = ax1.plot(loss_probabilities, values['k_model'], '-', label=f'{name} (модель)', linewidth=2)
+        ax1.plot(loss_probabilities, values['k'], 'o', color=line.get_color(), label=f'{name} (моделирование)')
+        line, = ax2.plot(loss_probabilities, values['t_model'], '-', label=f'{name} (модель)', linewidth=2)
+        ax2.plot(loss_probabilities, values['t'], 'o', color=line.get_color(), label=f'{name} (моделирование)')
+    
+    ax1.set_xlabel('Вероятность потери пакета (p)')
+    ax1.set_ylabel('Коэффициент эффективности (k)')
+    ax1.set_title('Коэффициент эффективности: модель и моделирование')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    
+    ax2.set_xlabel('Вероятность потери пакета (p)')
+    ax2.set_ylabel('Время передачи (t), сек')
+    ax2.set_title('Время передачи: модель и моделирование')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    plt.show()
+
 def plot_results(data_sizes, results):
     plt.figure(figsize=(12, 7))
     
@@ -345,4 +874,5 @@ def plot_results(data_sizes, results):
     plt.show()
 
 if __name__ == "__main__":
-    compare_protocols()
\ No newline at end of file
+    # Результаты прогонов сохраняются между запусками: пересчитываются только новые точки
+    compare_protocols(cache=ResultCache())
\ No newline at end of file
@@ -0,0 +1,165 @@
+import math
+from typing import Dict, Tuple
+import numpy as np
+
+# Квантиль нормального распределения для 95% доверительного интервала
+Z_95 = 1.959963984540054
+
+
+def confidence_interval(samples, z: float = Z_95) -> Tuple[float, float]:
+    """Среднее и полуширина доверительного интервала"""
+    samples = np.asarray(samples, dtype=float)
+    mean = float(samples.mean()) if samples.size else 0.0
+    if samples.size < 2:
+        return mean, 0.0
+    return mean, float(z * samples.std(ddof=1) / math.sqrt(samples.size))
+
+
+def simulate_batch(protocol_type: str, data_length: int, window_size: int = 1, package_data_size: int = 2,
+                   packet_loss_prob: float = 0.2, ack_loss_prob: float = 0.1, corruption_prob: float = 0.1,
+                   timeout: float = 2.0, propagation_delay: float = 0.0005, replications: int = 1000,
+                   seed=None) -> Dict:
+    """Пакетное моделирование множества независимых передач сразу на массивах NumPy
+
+    Время разбито на такты длиной в RTT: за такт отправитель посылает всё, что
+    позволяет окно, а подтверждения успевают вернуться. Возвращает те же метрики,
+    что и ProtocolSimulator (k - отправок на полезный пакет, время передачи),
+    усредненные по репликациям и с 95% доверительными интервалами.
+    """
+    if protocol_type == "auto":
+        protocol_type = "stop_and_wait" if window_size == 1 else "go_back_n"
+    if protocol_type == "stop_and_wait":
+        window_size = 1
+
+    n_packets = math.ceil(data_length / package_data_size)
+    rtt = 2 * propagation_delay
+    timeout_slots = max(1, math.ceil(timeout / rtt)) if rtt > 0 else 1
+    # Пакет не дошел целым, если потерян или поврежден
+    fail_prob = 1 - (1 - packet_loss_prob) * (1 - corruption_prob)
+    rng = np.random.default_rng(seed)
+
+    if protocol_type == "selective_repeat":
+        sent, slots = _selective_repeat_batch(n_packets, window_size, fail_prob, ack_loss_prob,
+                                              timeout_slots, replications, rng)
+    else:
+        sent, slots = _go_back_n_batch(n_packets, window_size, fail_prob, ack_loss_prob,
+                                       timeout_slots, replications, rng)
+
+    useful_packets = data_length // package_data_size
+    k = sent / useful_packets if useful_packets > 0 else np.zeros(replications)
+    k_mean, k_ci = confidence_interval(k)
+    time_mean, time_ci = confidence_interval(slots * rtt)
+
+    return {
+        'protocol_type': protocol_type,
+        'replications': replications,
+        'k': k_mean,
+        'k_ci': k_ci,
+        'total_time': time_mean,
+        'total_time_ci': time_ci,
+        'total_sent': float(sent.mean()),
+        'efficiency': 1 / k_mean if k_mean > 0 else 0
+    }
+
+
+def _draw(rng, mask, prob):
+    # Случайные исходы разыгрываются только для реально отправленных пакетов
+    result = np.zeros(mask.shape, dtype=bool)
+    if prob > 0:
+        result[mask] = rng.random(int(mask.sum())) < prob
+    return result
+
+
+def _go_back_n_batch(n, window, fail_prob, ack_loss_prob, timeout_slots, replications, rng):
+    offsets = np.arange(window)
+    base = np.zeros(replications, dtype=np.int64)
+    next_seq = np.zeros(replications, dtype=np.int64)
+    expected = np.zeros(replications, dtype=np.int64)
+    timer = np.full(replications, -1, dtype=np.int64)
+    sent = np.zeros(replications, dtype=np.int64)
+    # У каждой репликации свои часы: простой в ожидании таймера пропускается сразу
+    now = np.zeros(replications, dtype=np.int64)
+    active = base < n
+
+    while active.any():
+        # Истек таймер - повторяем всё окно с base
+        fired = active & (timer >= 0) & (now - timer >= timeout_slots)
+        start = np.where(fired, base, next_seq)
+        timer = np.where(fired, now, timer)
+
+        end = np.where(active, np.minimum(base + window, n), start)
+        timer = np.where(active & (base == next_seq) & (end > next_seq), now, timer)
+        next_seq = np.maximum(next_seq, end)
+
+        seq = base[:, None] + offsets
+        flight = (seq >= start[:, None]) & (seq < end[:, None])
+        sent += flight.sum(axis=1)
+
+        fail = _draw(rng, flight, fail_prob)
+        ack_fail = _draw(rng, flight, ack_loss_prob)
+
+        # Получатель принимает непрерывную цепочку начиная с expected до первой ошибки
+        broken = (seq >= expected[:, None]) & (fail | ~flight)
+        first_bad = np.where(broken, seq, (base + window)[:, None]).min(axis=1)
+        accepted = (seq >= expected[:, None]) & (seq < first_bad[:, None])
+        duplicates = flight & ~fail & (seq < expected[:, None])
+
+        max_ack = np.where(accepted & ~ack_fail, seq, -1).max(axis=1)
+        dup_acked = (duplicates & ~ack_fail).any(axis=1)
+        max_ack = np.maximum(max_ack, np.where(dup_acked, expected - 1, -1))
+        expected = np.maximum(expected, first_bad)
+
+        new_base = np.maximum(base, max_ack + 1)
+        advanced = new_base > base
+        timer = np.where(advanced, np.where(new_base < next_seq, now, -1), timer)
+        base = new_base
+
+        # Если окно заполнено, следующий шаг - срабатывание таймера
+        can_send = next_seq < np.minimum(base + window, n)
+        wait_until = np.where(timer >= 0, timer + timeout_slots, now + 1)
+        now = np.where(active, np.where(can_send, now + 1, np.maximum(now + 1, wait_until)), now)
+        active &= base < n
+
+    return sent, now
+
+
+def _selective_repeat_batch(n, window, fail_prob, ack_loss_prob, timeout_slots, replications, rng):
+    seq = np.arange(n)
+    acked = np.zeros((replications, n), dtype=bool)
+    sent_at = np.zeros((replications, n), dtype=np.int64)
+    base = np.zeros(replications, dtype=np.int64)
+    next_seq = np.zeros(replications, dtype=np.int64)
+    sent = np.zeros(replications, dtype=np.int64)
+    now = np.zeros(replications, dtype=np.int64)
+    active = base < n
+
+    while active.any():
+        # Индивидуальные таймеры: повторяем только неподтвержденные просроченные пакеты
+        outstanding = (seq >= base[:, None]) & (seq < next_seq[:, None]) & ~acked
+        expired = outstanding & ((now[:, None] - sent_at) >= timeout_slots)
+
+        end = np.where(active, np.minimum(base + window, n), next_seq)
+        new = (seq >= next_seq[:, None]) & (seq < end[:, None])
+        next_seq = np.maximum(next_seq, end)
+
+        flight = (expired | new) & active[:, None]
+        sent_at = np.where(flight, now[:, None], sent_at)
+        sent += flight.sum(axis=1)
+
+        # Все отправленные номера лежат в окне получателя, поэтому каждый целый пакет подтверждается
+        delivered = flight & ~_draw(rng, flight, fail_prob)
+        acked |= delivered & ~_draw(rng, delivered, ack_loss_prob)
+
+        # base - первый неподтвержденный пакет
+        unacked = ~acked
+        base = np.where(unacked.any(axis=1), unacked.argmax(axis=1), n)
+
+        # Если окно заполнено, следующий шаг - ближайший истекающий таймер
+        can_send = next_seq < np.minimum(base + window, n)
+        outstanding = (seq < next_seq[:, None]) & unacked
+        wait_until = np.where(outstanding, sent_at + timeout_slots, np.iinfo(np.int64).max).min(axis=1)
+        wait_until = np.where(outstanding.any(axis=1), wait_until, now + 1)
+        now = np.where(active, np.where(can_send, now + 1, np.maximum(now + 1, wait_until)), now)
+        active &= base < n
+
+    return sent, now
@@ -0,0 +1,183 @@
+import heapq
+import itertools
+from typing import Dict, List, Sequence
+from clock import VirtualClock
+from network import NetworkSimulator
+from simulator import ProtocolSimulator
+
+
+def jain_fairness(values: Sequence[float]) -> float:
+    """Индекс справедливости Джейна: 1 - поровну, 1/n - все досталось одному"""
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    return total * total / (len(values) * squares) if squares > 0 else 1.0
+
+
+class MultiFlowSimulator:
+    """Несколько пар отправитель/получатель на одном общем канале
+
+    Все потоки живут в одной очереди событий на виртуальном времени: пакеты
+    данных разных потоков проходят через общий NetworkSimulator (общая очередь,
+    полоса и потери), метка потока едет вместе с пакетом. Событие затрагивает
+    только свой поток, поэтому стоимость события - O(log событий), а не O(потоков),
+    и тысячи потоков не требуют ни потоков ОС, ни задач asyncio.
+
+    Каждый поток задается словарем параметров ProtocolSimulator: обязательный
+    'data', а также 'window_size', 'protocol_type', 'start' (момент старта) и т.д.
+    """
+
+    def __init__(self, flows: List[Dict], **kwargs):
+        self.clock = VirtualClock()
+        self.network = NetworkSimulator(
+            kwargs.get('packet_loss_prob', 0.2),
+            kwargs.get('ack_loss_prob', 0.1),
+            kwargs.get('corruption_prob', 0.1),
+            kwargs.get('propagation_delay', 0.0005),
+            kwargs.get('bandwidth'),
+            kwargs.get('queue_capacity'),
+            self.clock,
+            kwargs.get('error_model'),
+            kwargs.get('seed')
+        )
+
+        self.flows = []
+        self.starts = []
+        for flow in flows:
+            params = dict(kwargs, **flow)
+            if params.get('fec_group') is not None:
+                # Кодер и декодер FEC вызывает цикл ProtocolSimulator, общий цикл потоков их не видит
+                raise ValueError("FEC не поддерживается в MultiFlowSimulator")
+            data = params.pop('data')
+            window_size = params.pop('window_size', 1)
+            protocol_type = params.pop('protocol_type', "auto")
+            self.starts.append(params.pop('start', 0.0))
+            params.update(clock=self.clock, network=self.network)
+            self.flows.append(ProtocolSimulator(data, window_size, protocol_type, **params))
+
+        self.stats = {
+            'flows': [],
+            'iterations': 0,
+            'total_time': 0,
+            'aggregate_goodput': 0,
+            'fairness': 0,
+            'queue_drops': 0
+        }
+
+    def run_simulation(self) -> bool:
+        events = []
+        counter = itertools.count()
+        network = self.network
+        flows = self.flows
+        scheduled_timeouts = [None] * len(flows)
+        scheduled_flushes = [None] * len(flows)
+        finish_times = [None] * len(flows)
+        remaining = len(flows)
+        processed = 0
+
+        def schedule(timestamp, kind, flow, payload=None):
+            heapq.heappush(events, (timestamp, next(counter), kind, flow, payload))
+
+        def pump(flow):
+            # Досылка новых пакетов и перепланирование таймеров одного потока
+            nonlocal remaining
+            simulator = flows[flow]
+            sender = simulator.sender
+            while sender.can_send_new_packet():
+                packet = sender.send_new_packet()
+                if packet:
+                    network.transmit_packet(packet, flow)
+
+            if finish_times[flow] is None and sender.all_packets_confirmed():
+                finish_times[flow] = self.clock.now()
+                remaining -= 1
+
+            deadline = sender.next_timeout()
+            if deadline is not None and deadline != scheduled_timeouts[flow]:
+                schedule(deadline, 'timeout', flow)
+                scheduled_timeouts[flow] = deadline
+
+            flush_at = simulator.receiver.ack_deadline()
+            if flush_at is not None and flush_at != scheduled_flushes[flow]:
+                schedule(flush_at, 'flush', flow)
+                scheduled_flushes[flow] = flush_at
+
+        def send_ack(timestamp, flow, ack_num):
+            flows[flow].acks_sent += 1
+            if network.transmit_ack(ack_num):
+                schedule(timestamp + network.propagation_delay, 'ack', flow, ack_num)
+
+        for flow, start in enumerate(self.starts):
+            flows[flow].acks_sent = 0
+            schedule(start, 'send', flow)
+
+        while remaining:
+            arrival = network.next_arrival()
+            if events and (arrival is None or events[0][0] <= arrival):
+                timestamp, _, kind, flow, payload = heapq.heappop(events)
+            elif arrival is not None:
+                timestamp, kind = arrival, 'deliver'
+            else:
+                break
+            self.clock.advance_to(timestamp)
+            processed += 1
+
+            if kind == 'deliver':
+                touched = set()
+                for packet, flow in network.deliver_ready_tagged(timestamp):
+                    success, ack_num = flows[flow].receiver.receive_packet(packet)
+                    if success:
+                        send_ack(timestamp, flow, ack_num)
+                    touched.add(flow)
+                for flow in touched:
+                    pump(flow)
+                continue
+
+            sender = flows[flow].sender
+            if kind == 'ack':
+                sender.receive_ack(payload)
+                for packet in sender.fast_retransmit():
+                    network.transmit_packet(packet, flow)
+            elif kind == 'timeout':
+                for packet in sender.check_timeout():
+                    network.transmit_packet(packet, flow)
+            elif kind == 'flush':
+                ack = flows[flow].receiver.flush_ack(timestamp)
+                if ack is not None:
+                    send_ack(timestamp, flow, ack)
+            pump(flow)
+
+        return self._collect(processed, finish_times)
+
+    def _collect(self, processed: int, finish_times: List) -> bool:
+        flow_stats = []
+        total_bytes = 0
+        all_success = True
+        for simulator, start, finish in zip(self.flows, self.starts, finish_times):
+            sender = simulator.sender
+            success = finish is not None and simulator.verify_output()
+            simulator.close()
+            all_success = all_success and success
+            elapsed = (finish - start) if finish is not None else self.clock.now() - start
+            total_bytes += sender.packets.total_bytes
+            flow_stats.append({
+                'protocol': sender.get_protocol_name(),
+                'start': start,
+                'finish': finish,
+                'total_time': elapsed,
+                'throughput': sender.packets.total_bytes * 8 / elapsed if elapsed > 0 else 0.0,
+                'total_sent': sender.stats['total_sent'],
+                'retransmissions': sender.stats['retransmissions'],
+                'acks_sent': simulator.acks_sent,
+                'success': success
+            })
+
+        total_time = self.clock.now() - min(self.starts, default=0.0)
+        self.stats.update({
+            'flows': flow_stats,
+            'iterations': processed,
+            'total_time': total_time,
+            'aggregate_goodput': total_bytes * 8 / total_time if total_time > 0 else 0.0,
+            'fairness': jain_fairness([flow['throughput'] for flow in flow_stats]) if flow_stats else 1.0,
+            'queue_drops': self.network.queue_drops
+        })
+        return all_success
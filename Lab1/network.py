@@ -1,29 +1,111 @@
-import random
+import copy
+from collections import deque
+from typing import List, Optional, Tuple
+import numpy as np
 from packet import Packet
+from clock import WallClock
+from errors import PacketCorruption, BatchedRandom, bind_rng
+from tracing import DROP, QUEUE_DROP, CORRUPT, ACK_LOST, ack_number
 
 class NetworkSimulator:
-    def __init__(self, packet_loss_prob: float = 0.2, ack_loss_prob: float = 0.1, corruption_prob: float = 0.1):
+    def __init__(self, packet_loss_prob: float = 0.2, ack_loss_prob: float = 0.1, corruption_prob: float = 0.1,
+                 propagation_delay: float = 0.0, bandwidth: float = None, queue_capacity: int = None,
+                 clock=None, error_model=None, seed=None):
         self.packet_loss_prob = packet_loss_prob
         self.ack_loss_prob = ack_loss_prob
         self.corruption_prob = corruption_prob
-        self.packets_in_transit = []
-    
-    def transmit_packet(self, packet: Packet) -> bool:
-        packet_copy = Packet(packet.seq_num, packet.data)
-        packet_copy.hash_sum = packet.hash_sum
-        
-        if random.random() < self.packet_loss_prob:
+        # Модель канала: задержка распространения (с), пропускная способность (бит/с),
+        # емкость очереди перед линией (пакетов, None - без ограничения)
+        self.propagation_delay = propagation_delay
+        self.bandwidth = bandwidth
+        self.queue_capacity = queue_capacity
+        self.clock = clock if clock is not None else WallClock()
+        # Собственный генератор канала (seed - число, SeedSequence или numpy Generator): прогоны
+        # в одном процессе независимы и воспроизводимы. Потери пакетов и ACK, порча - из одного
+        # буфера заранее вытянутых равномерных чисел
+        self.rng = np.random.default_rng(seed)
+        self.random = BatchedRandom(self.rng)
+        self.uniform = self.random.next_uniform
+        # Модель ошибок работает над байтами; по умолчанию - порча целого пакета с corruption_prob.
+        # Переданная модель копируется: ее состояние (цепь Маркова) и привязка генератора
+        # не переходят из прогона в прогон, и одинаковый seed дает одинаковый результат
+        if error_model is None:
+            error_model = PacketCorruption(corruption_prob, self.random)
+        else:
+            error_model = copy.deepcopy(error_model)
+        self.error_model = error_model
+        bind_rng(self.error_model, self.random)
+
+        # Пакеты в пути в порядке прихода: (время прихода, пакет, метка потока)
+        self.packets_in_transit = deque()
+        self.queued_departures = deque()  # Моменты окончания передачи пакетов в очереди
+        self.link_free_at = 0.0
+        self.queue_drops = 0
+        # Трассировка событий канала (tracing.Tracer), None - выключена
+        self.tracer = None
+
+    def transmit_packet(self, packet: Packet, flow=None) -> bool:
+        now = self.clock.now()
+
+        # Пакеты, уже ушедшие в линию, освобождают очередь
+        while self.queued_departures and self.queued_departures[0] <= now:
+            self.queued_departures.popleft()
+        if self.queue_capacity is not None and len(self.queued_departures) >= self.queue_capacity:
+            self.queue_drops += 1
+            if self.tracer is not None:
+                self.tracer.record(now, QUEUE_DROP, packet.seq_num)
+            return False
+
+        # Сериализация на линии: пакеты уходят строго по очереди
+        departure = max(now, self.link_free_at)
+        if self.bandwidth:
+            departure += len(packet.data) * 8 / self.bandwidth
+        self.link_free_at = departure
+        self.queued_departures.append(departure)
+
+        if self.packet_loss_prob and self.uniform() < self.packet_loss_prob:
+            if self.tracer is not None:
+                self.tracer.record(now, DROP, packet.seq_num)
+            return False
+
+        data = self.error_model.apply(packet.data)
+        if self.tracer is not None and data is not packet.data:
+            self.tracer.record(now, DROP if data is None else CORRUPT, packet.seq_num)
+        if data is None:
             return False
-        
-        if random.random() < self.corruption_prob:
-            original_data = packet_copy.data
-            corrupted_data = ''.join(chr(random.randint(97, 122)) for _ in range(len(original_data)))
-            packet_copy.data = corrupted_data
-        
-        self.packets_in_transit.append(packet_copy)
+
+        # Тип пакета сохраняется: пакеты четности FEC (fec.py) едут по тому же каналу
+        packet_copy = type(packet)(packet.seq_num, data, packet.hash_sum, packet.checksum)
+
+        # Время прихода не убывает (FIFO-линия), поэтому хватает очереди deque
+        self.packets_in_transit.append((departure + self.propagation_delay, packet_copy, flow))
         return True
-    
+
     def transmit_ack(self, ack_num: int) -> bool:
-        if random.random() < self.ack_loss_prob:
+        if self.ack_loss_prob and self.uniform() < self.ack_loss_prob:
+            if self.tracer is not None:
+                self.tracer.record(self.clock.now(), ACK_LOST, ack_number(ack_num))
             return False
-        return True
\ No newline at end of file
+        return True
+
+    def spawn(self, count: int) -> List[np.random.Generator]:
+        # Независимые дочерние генераторы, например для параллельных исполнителей
+        return self.rng.spawn(count)
+
+    def next_arrival(self) -> Optional[float]:
+        return self.packets_in_transit[0][0] if self.packets_in_transit else None
+
+    def deliver_ready(self, now: float) -> List[Packet]:
+        # Забираем все пакеты, дошедшие к моменту now, за O(1) на пакет
+        delivered = []
+        while self.packets_in_transit and self.packets_in_transit[0][0] <= now:
+            delivered.append(self.packets_in_transit.popleft()[1])
+        return delivered
+
+    def deliver_ready_tagged(self, now: float) -> List[Tuple[Packet, object]]:
+        # То же для общего канала: каждый пакет возвращается с меткой своего потока
+        delivered = []
+        while self.packets_in_transit and self.packets_in_transit[0][0] <= now:
+            _, packet, flow = self.packets_in_transit.popleft()
+            delivered.append((packet, flow))
+        return delivered
@@ -1,15 +1,72 @@
-import hashlib
+from typing import Iterator, NamedTuple
+from checksum import get_checksum
 
 class Packet:
-    def __init__(self, seq_num: int, data: str):
+    __slots__ = ('seq_num', 'data', 'hash_sum', 'checksum', 'sent_time', 'ack_received')
+
+    def __init__(self, seq_num: int, data: bytes, hash_sum: int = None, checksum=None):
         self.seq_num = seq_num
         self.data = data
-        self.hash_sum = self.calculate_hash_sum(data)
+        # Функция контрольной суммы выбирается стратегией (CRC32, Adler-32, RFC 1071, SHA-256)
+        self.checksum = get_checksum(checksum)
+        # Контрольная сумма может быть уже посчитана (таблица пакетов отправителя)
+        self.hash_sum = hash_sum if hash_sum is not None else self.calculate_hash_sum(data)
         self.sent_time = None
         self.ack_received = False
-    
-    def calculate_hash_sum(self, data: str) -> str:
-        return hashlib.sha256(data.encode()).hexdigest()
-    
+
+    def calculate_hash_sum(self, data: bytes) -> int:
+        if isinstance(data, str):
+            data = data.encode()
+        return self.checksum(data)
+
     def verify_hash(self) -> bool:
-        return self.calculate_hash_sum(self.data) == self.hash_sum
\ No newline at end of file
+        return self.calculate_hash_sum(self.data) == self.hash_sum
+
+
+class SelectiveAck(NamedTuple):
+    """Кумулятивное подтверждение с битовой картой выборочных подтверждений (SACK)
+
+    Все пакеты до cumulative включительно приняты; бит i карты означает,
+    что принят пакет cumulative + 1 + i из окна приема.
+    """
+    cumulative: int
+    bitmap: int = 0
+
+    def selected(self) -> Iterator[int]:
+        bitmap = self.bitmap
+        while bitmap:
+            lowest = bitmap & -bitmap
+            yield self.cumulative + lowest.bit_length()
+            bitmap ^= lowest
+
+
+class SequenceSpace:
+    """Пространство номеров пакетов по модулю 2^bits (None - неограниченные номера)
+
+    Внутри отправителя и получателя номера абсолютные, в пакетах и подтверждениях
+    передаются только младшие bits бит. Принятый номер восстанавливается
+    относительно известной точки окна: окно Go-Back-N не больше 2^bits - 1,
+    окно Selective Repeat - не больше 2^(bits-1), иначе номера неоднозначны.
+    """
+
+    def __init__(self, bits: int = None):
+        self.bits = bits
+        self.modulus = 1 << bits if bits is not None else None
+
+    def check_window(self, window_size: int, selective: bool):
+        if self.modulus is None:
+            return
+        limit = self.modulus // 2 if selective else self.modulus - 1
+        if window_size > limit:
+            protocol = "Selective Repeat" if selective else "Go-Back-N"
+            raise ValueError(f"Окно {window_size} слишком велико для {self.bits}-битных номеров: "
+                             f"для {protocol} допустимо не больше {limit}")
+
+    def wire(self, seq_num: int) -> int:
+        return seq_num if self.modulus is None else seq_num % self.modulus
+
+    def forward(self, wire_seq: int, reference: int) -> int:
+        # Ближайший абсолютный номер не меньше reference с такими младшими битами
+        if self.modulus is None:
+            return wire_seq
+        return reference + (wire_seq - reference) % self.modulus
@@ -0,0 +1,214 @@
+import hashlib
+import mmap
+from array import array
+from typing import Iterator
+from packet import Packet
+from checksum import get_checksum
+
+# Размер блока, которым читаются файлы в потоковом режиме
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class PacketTable:
+    """Компактное хранилище пакетов отправителя
+
+    Вместо списка объектов Packet состояние хранится колонками: полезная нагрузка
+    лежит одним буфером (смещение сегмента = seq_num * package_data_size),
+    время отправки - в array('d'), флаги подтверждения и повторной отправки - в bytearray,
+    контрольные суммы - целыми числами в array('Q'). Объект Packet создается
+    только в момент передачи пакета в сеть.
+    """
+
+    def __init__(self, data, package_data_size: int = 2, checksum=None):
+        if isinstance(data, str):
+            data = data.encode()
+        self.payload = memoryview(data)
+        self.package_data_size = package_data_size
+        self.count = -(-len(self.payload) // package_data_size)
+        self.checksum = get_checksum(checksum)
+
+        self.sent_times = array('d', bytes(8 * self.count))
+        self.acked = bytearray(self.count)
+        self.retransmitted = bytearray(self.count)
+        payload, size, checksum = self.payload, package_data_size, self.checksum
+        self.checksums = array('Q', (checksum(payload[offset:offset + size])
+                                     for offset in range(0, len(payload), size)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def total_bytes(self) -> int:
+        return len(self.payload)
+
+    @property
+    def size_hint(self) -> int:
+        return len(self.payload)
+
+    def has_packet(self, seq_num: int) -> bool:
+        return seq_num < self.count
+
+    def segment(self, seq_num: int) -> memoryview:
+        offset = seq_num * self.package_data_size
+        return self.payload[offset:offset + self.package_data_size]
+
+    def packet(self, seq_num: int) -> Packet:
+        # Представление строки таблицы в виде пакета для сети
+        packet = Packet(seq_num, bytes(self.segment(seq_num)), self.checksums[seq_num], self.checksum)
+        packet.sent_time = self.sent_times[seq_num]
+        packet.ack_received = bool(self.acked[seq_num])
+        return packet
+
+    def mark_sent(self, seq_num: int, timestamp: float):
+        self.sent_times[seq_num] = timestamp
+
+    def sent_time(self, seq_num: int) -> float:
+        return self.sent_times[seq_num]
+
+    def mark_retransmitted(self, seq_num: int):
+        self.retransmitted[seq_num] = 1
+
+    def was_retransmitted(self, seq_num: int) -> bool:
+        return bool(self.retransmitted[seq_num])
+
+    def set_acked(self, seq_num: int):
+        self.acked[seq_num] = 1
+
+    def is_acked(self, seq_num: int) -> bool:
+        return bool(self.acked[seq_num])
+
+    def release(self, seq_num: int):
+        # Данные целиком в памяти, освобождать нечего
+        pass
+
+    def verify(self, received) -> bool:
+        return self.payload == received
+
+    def verify_digest(self, length: int, digest: bytes) -> bool:
+        # Проверка по длине и SHA-256, когда принятые данные не хранятся (StreamSink)
+        return length == len(self.payload) and hashlib.sha256(self.payload).digest() == digest
+
+
+class StreamPacketTable:
+    """Потоковое хранилище пакетов отправителя
+
+    Сегменты вытягиваются из итератора, файла или mmap лениво - только когда
+    отправитель доходит до них. В памяти остаются лишь пакеты текущего окна,
+    контрольные суммы считаются при создании пакета. Для проверки результата
+    хранится только длина и SHA-256 всего прочитанного потока.
+    """
+
+    def __init__(self, source, package_data_size: int = 2, checksum=None):
+        self.package_data_size = package_data_size
+        self.checksum = get_checksum(checksum)
+        self._segments = iter_segments(source, package_data_size)
+        self.window = {}  # seq_num -> [сегмент, время отправки, подтвержден, отправлялся повторно]
+        self.first = 0  # Наименьший номер, еще хранящийся в окне
+        self.count = 0  # Сколько сегментов прочитано из источника
+        self.exhausted = False
+        self.total_bytes = 0
+        self.digest = hashlib.sha256()
+        # Размер известен заранее только для mmap
+        self.size_hint = len(source) if isinstance(source, mmap.mmap) else None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def has_packet(self, seq_num: int) -> bool:
+        while seq_num >= self.count and not self.exhausted:
+            segment = next(self._segments, None)
+            if segment is None:
+                self.exhausted = True
+                break
+            self.window[self.count] = [segment, 0.0, False, False]
+            self.count += 1
+            self.total_bytes += len(segment)
+            self.digest.update(segment)
+        return seq_num < self.count
+
+    def segment(self, seq_num: int) -> bytes:
+        return self.window[seq_num][0]
+
+    def packet(self, seq_num: int) -> Packet:
+        segment, sent_time, acked, _ = self.window[seq_num]
+        packet = Packet(seq_num, segment, checksum=self.checksum)
+        packet.sent_time = sent_time
+        packet.ack_received = acked
+        return packet
+
+    def mark_sent(self, seq_num: int, timestamp: float):
+        self.window[seq_num][1] = timestamp
+
+    def sent_time(self, seq_num: int) -> float:
+        return self.window[seq_num][1]
+
+    def mark_retransmitted(self, seq_num: int):
+        self.window[seq_num][3] = True
+
+    def was_retransmitted(self, seq_num: int) -> bool:
+        entry = self.window.get(seq_num)
+        return entry[3] if entry is not None else True
+
+    def set_acked(self, seq_num: int):
+        entry = self.window.get(seq_num)
+        if entry is not None:
+            entry[2] = True
+
+    def is_acked(self, seq_num: int) -> bool:
+        # Освобожденные пакеты ниже окна уже были подтверждены
+        entry = self.window.get(seq_num)
+        return entry[2] if entry is not None else seq_num < self.first
+
+    def release(self, seq_num: int):
+        # Подтвержденный префикс больше не нужен отправителю
+        while self.first < seq_num:
+            self.window.pop(self.first, None)
+            self.first += 1
+
+    def verify(self, received) -> bool:
+        return self.verify_digest(len(received), hashlib.sha256(received).digest())
+
+    def verify_digest(self, length: int, digest: bytes) -> bool:
+        return length == self.total_bytes and digest == self.digest.digest()
+
+
+def create_packet_table(data, package_data_size: int = 2, checksum=None):
+    """Готовые данные в памяти - PacketTable, файлы, mmap и итераторы - потоковый режим"""
+    if isinstance(data, (str, bytes, bytearray, memoryview)):
+        return PacketTable(data, package_data_size, checksum)
+    return StreamPacketTable(data, package_data_size, checksum)
+
+
+def iter_segments(source, package_data_size: int) -> Iterator[bytes]:
+    if isinstance(source, mmap.mmap):
+        # Страницы mmap подгружаются системой по мере обращения
+        for offset in range(0, len(source), package_data_size):
+            yield source[offset:offset + package_data_size]
+        return
+    if hasattr(source, 'read'):
+        source = _read_chunks(source)
+    yield from _rechunk(source, package_data_size)
+
+
+def _read_chunks(fileobj) -> Iterator:
+    while True:
+        chunk = fileobj.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _rechunk(chunks, package_data_size: int) -> Iterator[bytes]:
+    # Нарезка произвольных блоков на сегменты ровно по package_data_size байт
+    buffer = bytearray()
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        buffer += chunk
+        offset = 0
+        while len(buffer) - offset >= package_data_size:
+            yield bytes(buffer[offset:offset + package_data_size])
+            offset += package_data_size
+        del buffer[:offset]
+    if buffer:
+        yield bytes(buffer)
@@ -1,68 +1,157 @@
-from typing import List, Tuple, Dict
-from packet import Packet
+import math
+from typing import List, Tuple, Dict, Optional
+from packet import Packet, SelectiveAck, SequenceSpace
+from sink import BufferSink
+from clock import WallClock
+
+# Срок отложенного подтверждения по умолчанию при ack_every > 1 (с): без него хвост
+# передачи короче ack_every пакетов ждал бы таймаута отправителя
+DEFAULT_ACK_DELAY = 0.002
 
 class Receiver:
-    def __init__(self, package_data_size: int = 2):
+    def __init__(self, package_data_size: int = 2, sink=None, seq_bits: int = None):
         self.package_data_size = package_data_size
+        # Номера в пакетах по модулю 2^seq_bits восстанавливаются относительно ожидаемого
+        self.sequence = SequenceSpace(seq_bits)
         self.expected_seq_num = 0
-        self.received_packets = []
+        # Принятые по порядку сегменты сразу пишутся на свое место в выходном буфере
+        self.sink = sink if sink is not None else BufferSink(package_data_size)
         self.last_ack_sent = -1
     
     def receive_packet(self, packet: Packet) -> Tuple[bool, int]:
+        wire = self.sequence.wire
         if not packet.verify_hash():
-            return False, self.expected_seq_num - 1
+            return False, wire(self.expected_seq_num - 1)
         
-        if packet.seq_num == self.expected_seq_num:
-            self.received_packets.append((packet.seq_num, packet.data))
+        # При конечных номерах старый дубликат неотличим от пакета впереди,
+        # но ответ в обоих случаях одинаковый - последний подтвержденный номер
+        seq_num = self.sequence.forward(packet.seq_num, self.expected_seq_num)
+        if seq_num == self.expected_seq_num:
+            self.sink.write(seq_num, packet.data)
             self.expected_seq_num += 1
             ack_num = self.expected_seq_num - 1
             self.last_ack_sent = ack_num
-            return True, ack_num
+            return True, wire(ack_num)
         
-        elif packet.seq_num < self.expected_seq_num:
-            return True, self.last_ack_sent
+        elif seq_num < self.expected_seq_num:
+            return True, wire(self.last_ack_sent)
         
         else:
-            return False, self.expected_seq_num - 1
+            # Пакет не по порядку отбрасывается, но последний подтвержденный номер
+            # отправляется повторно - дубликаты ACK запускают быструю повторную передачу
+            return True, wire(self.expected_seq_num - 1)
+    
+    def ack_deadline(self) -> Optional[float]:
+        # Отложенных подтверждений у получателя Go-Back-N нет
+        return None
     
-    def get_reassembled_data(self) -> str:
-        self.received_packets.sort(key=lambda x: x[0])
-        return ''.join(data for seq, data in self.received_packets)
+    def flush_ack(self, now: float):
+        return None
+    
+    def get_reassembled_data(self) -> memoryview:
+        return self.sink.view()
 
 
 class SelectiveRepeatReceiver(Receiver):
-    def __init__(self, package_data_size: int = 2, window_size: int = 4):
-        super().__init__(package_data_size)
+    def __init__(self, package_data_size: int = 2, window_size: int = 4, sink=None, sack: bool = False,
+                 ack_every: int = None, ack_delay: float = None, clock=None, seq_bits: int = None):
+        super().__init__(package_data_size, sink, seq_bits)
+        self.sequence.check_window(window_size, selective=True)
         self.window_size = window_size
-        self.receive_window = {}  # Хранит пакеты, полученные не по порядку
+        # Кольцевой буфер окна приема: пакет seq_num лежит в ячейке seq_num % window_size.
+        # Память ограничена окном, а не длиной передачи
+        self.receive_window = [None] * window_size
         self.base_seq = 0
+        
+        # SACK: вместо номера пакета - кумулятивный ACK и битовая карта окна приема.
+        # Отложенный режим (ack_every > 1 или ack_delay) подтверждает сразу
+        # несколько пакетов и поэтому всегда использует SACK.
+        # ack_every=None: с ack_delay - без предела по числу (только по таймеру), иначе каждый пакет
+        if ack_every is None:
+            ack_every = 1 if ack_delay is None else math.inf
+        elif ack_delay is None and ack_every > 1:
+            ack_delay = DEFAULT_ACK_DELAY
+        self.ack_every = ack_every
+        self.ack_delay = ack_delay
+        self.sack = sack or ack_every > 1 or ack_delay is not None
+        self.clock = clock if clock is not None else WallClock()
+        # Битовая карта присутствия в окне, она же карта SACK: бит i - принят пакет base_seq + i
+        self.sack_bitmap = 0
+        self.pending_acks = 0
+        self.pending_since = None
     
-    def receive_packet(self, packet: Packet) -> Tuple[bool, int]:
+    def _selective_ack(self) -> SelectiveAck:
+        return SelectiveAck(self.sequence.wire(self.base_seq - 1), self.sack_bitmap)
+    
+    def _acknowledge(self, packet: Packet) -> Tuple[bool, object]:
+        if not self.sack:
+            return True, packet.seq_num  # Подтверждаем конкретный полученный пакет (номер как в пакете)
+        
+        self.pending_acks += 1
+        if self.pending_acks >= self.ack_every:
+            return True, self._take_ack()
+        if self.pending_since is None and self.ack_delay is not None:
+            self.pending_since = self.clock.now()
+        return False, self._selective_ack()
+    
+    def _take_ack(self) -> SelectiveAck:
+        self.pending_acks = 0
+        self.pending_since = None
+        return self._selective_ack()
+    
+    def ack_deadline(self) -> Optional[float]:
+        # Момент, к которому нужно отправить накопленное подтверждение
+        if self.pending_since is None:
+            return None
+        return self.pending_since + self.ack_delay
+    
+    def flush_ack(self, now: float) -> Optional[SelectiveAck]:
+        deadline = self.ack_deadline()
+        if deadline is None or now < deadline:
+            return None
+        return self._take_ack()
+    
+    def _drain(self):
+        # Выдаем приемнику накопленную непрерывную последовательность от base_seq
+        window, size = self.receive_window, self.window_size
+        while self.sack_bitmap & 1:
+            slot = self.base_seq % size
+            self.sink.write(self.base_seq, window[slot])
+            window[slot] = None
+            self.base_seq += 1
+            self.sack_bitmap >>= 1
+    
+    def receive_packet(self, packet: Packet) -> Tuple[bool, object]:
         if not packet.verify_hash():
-            return False, self.base_seq
+            return False, self.sequence.wire(self.base_seq)
+        
+        # Абсолютный номер ищется в диапазоне [base_seq - окно, base_seq + окно):
+        # там и новые пакеты, и дубликаты уже подтвержденных
+        seq_num = self.sequence.forward(packet.seq_num, self.base_seq - self.window_size)
         
         # Если пакет в пределах окна
-        if self.base_seq <= packet.seq_num < self.base_seq + self.window_size:
-            # Сохраняем пакет, даже если он не в ожидаемой последовательности
-            self.receive_window[packet.seq_num] = packet.data
-            
-            # Обновляем базовый номер, если получили ожидаемый пакет
-            while self.base_seq in self.receive_window:
-                self.received_packets.append((self.base_seq, self.receive_window[self.base_seq]))
-                del self.receive_window[self.base_seq]
+        offset = seq_num - self.base_seq
+        if 0 <= offset < self.window_size:
+            if offset == 0:
+                # Ожидаемый пакет сразу уходит в приемник, минуя буфер
+                self.sink.write(seq_num, packet.data)
                 self.base_seq += 1
+                self.sack_bitmap >>= 1
+                self._drain()
+            elif not self.sack_bitmap >> offset & 1:
+                # Сохраняем пакет, полученный не по порядку (повтор в окне не перезаписывается)
+                self.receive_window[seq_num % self.window_size] = packet.data
+                self.sack_bitmap |= 1 << offset
             
-            return True, packet.seq_num  # Подтверждаем конкретный полученный пакет
+            return self._acknowledge(packet)
         
-        # Если пакет уже подтвержден (дубликат)
-        elif packet.seq_num < self.base_seq:
+        # Если пакет уже подтвержден (дубликат): подтверждение потерялось,
+        # отвечаем сразу, не дожидаясь накопления
+        elif seq_num < self.base_seq:
+            if self.sack:
+                return True, self._take_ack()
             return True, packet.seq_num
         
         # Пакет вне окна приема
         else:
-            return False, self.base_seq
-    
-    def get_reassembled_data(self) -> str:
-        # Сортируем по порядковым номерам
-        sorted_packets = sorted(self.received_packets, key=lambda x: x[0])
-        return ''.join(data for seq, data in sorted_packets)
\ No newline at end of file
+            return False, self.sequence.wire(self.base_seq)
@@ -0,0 +1,127 @@
+import math
+from typing import Dict, List, Sequence
+import numpy as np
+from montecarlo import confidence_interval, Z_95
+from sweep import expand_grid, run_sweep, spawn_seeds
+
+
+def _half_width_target(mean: float, target_width: float, relative: bool) -> float:
+    return target_width * abs(mean) if relative else target_width
+
+
+def _next_batch(samples: Sequence[float], target: float, z: float, done: int, limit: int) -> int:
+    # Сколько повторов еще нужно по текущей дисперсии: n = (z * s / target)^2, не больше удвоения
+    std = float(np.std(samples, ddof=1))
+    needed = math.ceil((z * std / target) ** 2) if target > 0 else limit
+    return max(1, min(needed - done, done, limit - done))
+
+
+def _share_budget(wanted: Sequence[int], left: int) -> List[int]:
+    # Бюджет делится по кругу по одному прогону: ни одна точка не остается без прогонов,
+    # пока другие получают сверх своей доли
+    granted = [0] * len(wanted)
+    while left > 0:
+        progress = False
+        for i, count in enumerate(wanted):
+            if left > 0 and granted[i] < count:
+                granted[i] += 1
+                left -= 1
+                progress = True
+        if not progress:
+            break
+    return granted
+
+
+def run_replicated(grid, metrics: Sequence[str] = ('k',), target_width: float = 0.05, relative: bool = True,
+                   min_replications: int = 5, max_replications: int = 200, budget: int = None, z: float = Z_95,
+                   workers: int = None, seed=None, cache=None, **fixed) -> List[Dict]:
+    """Повторы каждой точки сетки до нужной точности
+
+    Точка повторяется, пока полуширина доверительного интервала каждой метрики из
+    metrics не станет не больше target_width (доли среднего при relative, иначе
+    абсолютной), но не больше max_replications раз. budget - общий предел прогонов
+    на всю сетку; он делится между точками поровну, так что сначала все точки
+    получают min_replications прогонов и только потом - дополнительные.
+    Легкие точки сходятся за min_replications прогонов, шумные получают больше;
+    следующая порция оценивается по текущей дисперсии.
+    Все незавершенные точки считаются одной порцией run_sweep (пул процессов, кэш).
+
+    Возвращает по строке на точку: параметры, replications, converged,
+    success (все прогоны собрали данные) и для каждой метрики - среднее и <метрика>_ci.
+    Точка, получившая меньше 2 прогонов, не сходится: среднее и интервал - NaN.
+    """
+    if min_replications < 2:
+        raise ValueError("Для доверительного интервала нужно хотя бы 2 повтора")
+    points = expand_grid(grid)
+    if cache is not None and seed is None:
+        seed = cache.seed
+    point_seeds = spawn_seeds(seed, len(points))
+    samples = [{metric: [] for metric in metrics} for _ in points]
+    successes = [True] * len(points)
+    planned = [min(min_replications, max_replications)] * len(points)
+    done = [0] * len(points)
+    active = list(range(len(points)))
+    spent = 0
+
+    while active:
+        if budget is not None:
+            # Порция урезается так, чтобы не выйти за общий бюджет
+            left = budget - spent
+            if left <= 0:
+                break
+            granted = _share_budget([planned[i] - done[i] for i in active], left)
+            for i, count in zip(active, granted):
+                planned[i] = done[i] + count
+
+        batch = []
+        seeds = []
+        owners = []
+        for i in active:
+            if planned[i] <= done[i]:
+                continue
+            replication_seeds = spawn_seeds(point_seeds[i], planned[i])
+            for replication in range(done[i], planned[i]):
+                batch.append({**points[i], 'replication': replication})
+                seeds.append(replication_seeds[replication])
+                owners.append(i)
+        if not batch:
+            break
+
+        rows = run_sweep(batch, workers=workers, cache=cache, seeds=seeds, **fixed)
+        spent += len(rows)
+        for i, row in zip(owners, rows):
+            successes[i] = successes[i] and row['success']
+            for metric in metrics:
+                samples[i][metric].append(row[metric])
+        for i in active:
+            done[i] = planned[i]
+
+        still_active = []
+        for i in active:
+            growth = 0
+            for metric in metrics:
+                mean, half_width = confidence_interval(samples[i][metric], z)
+                target = _half_width_target(mean, target_width, relative)
+                if half_width > target:
+                    growth = max(growth, _next_batch(samples[i][metric], target, z, done[i], max_replications))
+            if growth and done[i] < max_replications:
+                planned[i] = done[i] + growth
+                still_active.append(i)
+        active = still_active
+
+    results = []
+    for i, point in enumerate(points):
+        result = dict(point)
+        result.update({'replications': done[i], 'success': successes[i], 'converged': done[i] >= 2})
+        for metric in metrics:
+            if done[i] < 2:
+                # По одному прогону (или без прогонов) ни среднее, ни разброс не оценить
+                result[metric] = result[metric + '_ci'] = math.nan
+                continue
+            mean, half_width = confidence_interval(samples[i][metric], z)
+            result[metric] = mean
+            result[metric + '_ci'] = half_width
+            if half_width > _half_width_target(mean, target_width, relative):
+                result['converged'] = False
+        results.append(result)
+    return results
@@ -0,0 +1,76 @@
+from typing import Optional
+
+
+class FixedTimeout:
+    """Постоянный таймаут повторной передачи, заданный вручную"""
+
+    def __init__(self, timeout: float = 1.0):
+        self.timeout = timeout
+
+    @property
+    def rto(self) -> float:
+        return self.timeout
+
+    def on_ack(self, rtt: Optional[float] = None):
+        pass
+
+    def on_timeout(self):
+        pass
+
+
+class AdaptiveTimeout:
+    """Адаптивный таймаут по оценке RTT (Jacobson/Karels, RFC 6298)
+
+    SRTT и RTTVAR сглаживаются экспоненциально, RTO = SRTT + k * RTTVAR.
+    При срабатывании таймера RTO удваивается (экспоненциальная отсрочка).
+    По правилу Карна для повторно отправленных пакетов замер не передается
+    (rtt=None), но подтверждение новых данных все равно сбрасывает отсрочку -
+    иначе при потерях Go-Back-N месяцами не получает чистых замеров.
+    """
+
+    def __init__(self, initial_timeout: float = 1.0, alpha: float = 1 / 8, beta: float = 1 / 4, k: float = 4,
+                 min_timeout: float = 0.01, max_timeout: float = 60.0, max_backoff: int = 8):
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_backoff = max_backoff
+        self.srtt = None
+        self.rttvar = None
+        self.base_rto = initial_timeout
+        self.backoff = 1
+        self.samples = 0
+
+    @property
+    def rto(self) -> float:
+        return min(self.base_rto * self.backoff, self.max_timeout)
+
+    def on_ack(self, rtt: Optional[float] = None):
+        # Подтверждены новые данные: канал жив, отсрочка больше не нужна
+        self.backoff = 1
+        if rtt is None:
+            return
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - rtt)
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * rtt
+        self.samples += 1
+        self.base_rto = min(max(self.srtt + self.k * self.rttvar, self.min_timeout), self.max_timeout)
+
+    def on_timeout(self):
+        # Отсрочка ограничена: при серии потерь RTO не уходит на минуты при RTT в миллисекунды
+        if self.backoff < self.max_backoff and self.base_rto * self.backoff < self.max_timeout:
+            self.backoff *= 2
+
+
+def make_timeout_policy(policy, timeout: float):
+    if policy is None or policy == "fixed":
+        return FixedTimeout(timeout)
+    if policy == "adaptive":
+        return AdaptiveTimeout(initial_timeout=timeout)
+    if hasattr(policy, 'rto'):
+        return policy
+    raise ValueError(f"Неизвестная политика таймаута: {policy}")
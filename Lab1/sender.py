@@ -1,153 +1,341 @@
-import time
-from typing import List, Dict
-from packet import Packet
+import itertools
+from collections import deque
+from typing import List, Dict, Optional
+from packet import Packet, SelectiveAck, SequenceSpace
+from packet_store import create_packet_table
+from clock import WallClock
+from timers import TimerHeap
+from rto import make_timeout_policy
+from congestion import make_congestion_control
+
+# Ключ единственного таймера окна Go-Back-N (номера пакетов неотрицательны)
+WINDOW_TIMER = -1
+# Предел длины траектории cwnd: при переполнении она прореживается вдвое
+CWND_HISTORY = 4096
 
 class Sender:
-    def __init__(self, data: str, package_data_size: int = 2, window_size: int = 1, timeout: float = 1.0):
+    def __init__(self, data: str, package_data_size: int = 2, window_size: int = 1, timeout: float = 1.0,
+                 clock=None, checksum=None, timeout_policy=None, dup_ack_threshold: int = None,
+                 congestion=None, seq_bits: int = None):
         self.data = data
         self.package_data_size = package_data_size
+        self.checksum = checksum
         self.window_size = window_size
+        # Номера в пакетах и ACK по модулю 2^seq_bits; внутри - абсолютные
+        self.sequence = SequenceSpace(seq_bits)
+        self.sequence.check_window(window_size, isinstance(self, SelectiveRepeatSender))
         self.timeout = timeout
+        # Политика таймаута: "fixed" - постоянный timeout, "adaptive" - оценка RTT (rto.py)
+        self.timeout_policy = make_timeout_policy(timeout_policy, timeout)
+        self.clock = clock if clock is not None else WallClock()
+        # Быстрая повторная передача после dup_ack_threshold дубликатов ACK (None - выключена)
+        self.dup_ack_threshold = dup_ack_threshold
+        self.dup_acks = 0
+        self.fast_retransmit_pending = False
+        # Управление перегрузкой (congestion.py): окно отправки = min(window_size, cwnd).
+        # None - окно фиксировано
+        self.congestion = make_congestion_control(congestion, self.clock)
+        self.recovery_point = 0  # Потери до этого номера относятся к уже учтенному эпизоду
         
         self.base = 0
         self.next_seq_num = 0
-        self.timer = None
+        # Граница уже отправленного: после отката окна (_resend_window) next_seq_num может быть ниже
+        self.high_water = 0
+        self.timers = TimerHeap()
         self.packets = self._create_packets()
         
         self.stats = {
             'total_sent': 0,
             'retransmissions': 0,
+            'fast_retransmits': 0,
+            'cwnd': [],  # Траектория окна перегрузки: (время, cwnd), не длиннее CWND_HISTORY
             'start_time': None,
             'end_time': None
         }
+        if self.congestion is not None:
+            self._record_cwnd()
+    
+    def _create_packets(self):
+        # Строка/байты - таблица в памяти; файл, mmap или итератор - потоковое чтение
+        return create_packet_table(self.data, self.package_data_size, self.checksum)
+    
+    def _prepare_packet(self, seq_num: int, timestamp: float, retransmission: bool = False) -> Packet:
+        # Отметка времени хранится в таблице, объект Packet создается только для сети
+        self.packets.mark_sent(seq_num, timestamp)
+        if retransmission:
+            self.packets.mark_retransmitted(seq_num)
+        packet = self.packets.packet(seq_num)
+        packet.seq_num = self.sequence.wire(seq_num)
+        return packet
+    
+    def _send_window(self) -> int:
+        if self.congestion is None:
+            return self.window_size
+        return min(self.window_size, self.congestion.window)
     
-    def _create_packets(self) -> List[Packet]:
-        packets = []
-        for i in range(0, len(self.data), self.package_data_size):
-            packet_data = self.data[i:i+self.package_data_size]
-            packet_number = i // self.package_data_size
-            packets.append(Packet(packet_number, packet_data))
-        return packets
+    def _record_cwnd(self):
+        trajectory = self.stats['cwnd']
+        if not trajectory or trajectory[-1][1] != self.congestion.cwnd:
+            trajectory.append((self.clock.now(), self.congestion.cwnd))
+            if len(trajectory) > CWND_HISTORY:
+                # Память ограничена и на долгих потоковых передачах; траектория по-прежнему
+                # покрывает весь прогон, только реже. Первая и последняя точки сохраняются
+                del trajectory[1::2]
+    
+    def _on_acked(self, acked: int):
+        if self.congestion is not None and acked:
+            window = self.congestion.window
+            self.congestion.on_ack(acked)
+            if self.congestion.window != window:
+                self._record_cwnd()
+    
+    def _on_loss(self, timeout: bool):
+        # Одно уменьшение окна на эпизод потерь: повторные потери из того же окна не учитываются
+        if self.congestion is None or self.base < self.recovery_point:
+            return
+        self.recovery_point = self.high_water
+        self.congestion.on_loss(timeout)
+        self._record_cwnd()
+    
+    def _sample_rtt(self, seq_num: int):
+        # Правило Карна: по повторно отправленным пакетам RTT не измеряется
+        if self.packets.was_retransmitted(seq_num):
+            self.timeout_policy.on_ack(None)
+        else:
+            self.timeout_policy.on_ack(self.clock.now() - self.packets.sent_time(seq_num))
     
     def can_send_new_packet(self) -> bool:
-        return (self.next_seq_num < len(self.packets) and 
-                self.next_seq_num < self.base + self.window_size)
+        return (self.next_seq_num < self.base + self._send_window() and
+                self.packets.has_packet(self.next_seq_num))
     
     def send_new_packet(self) -> Packet:
         if not self.can_send_new_packet():
             return None
         
-        packet = self.packets[self.next_seq_num]
-        packet.sent_time = time.time()
+        # Ниже high_water - досылка откатанного окна, это повторная передача
+        retransmission = self.next_seq_num < self.high_water
+        packet = self._prepare_packet(self.next_seq_num, self.clock.now(), retransmission)
         
         if self.base == self.next_seq_num:
-            self.timer = time.time()
+            self.timers.start(WINDOW_TIMER, self.clock.now() + self.timeout_policy.rto)
         
         self.next_seq_num += 1
         self.stats['total_sent'] += 1
+        if retransmission:
+            self.stats['retransmissions'] += 1
+        else:
+            self.high_water = self.next_seq_num
         
         return packet
     
     def receive_ack(self, ack_num: int) -> bool:
+        ack_num = self.sequence.forward(ack_num, self.base - 1)
+        if ack_num >= self.high_water:
+            # Устаревший или чужой номер - за пределами отправленного
+            return False
+        
         if ack_num >= self.base:
+            self._sample_rtt(ack_num)
+            
             # Помечаем пакеты как подтвержденные
             for seq_num in range(self.base, ack_num + 1):
-                if seq_num < len(self.packets):
-                    self.packets[seq_num].ack_received = True
+                self.packets.set_acked(seq_num)
             
+            self._on_acked(ack_num + 1 - self.base)
             self.base = ack_num + 1
+            # Запоздалый ACK пакета из откатанного окна: досылать его уже не нужно
+            self.next_seq_num = max(self.next_seq_num, self.base)
+            self.packets.release(self.base)
+            self.dup_acks = 0
+            self.fast_retransmit_pending = False
             
             if self.base < self.next_seq_num:
-                self.timer = time.time()
+                self.timers.start(WINDOW_TIMER, self.clock.now() + self.timeout_policy.rto)
             else:
-                self.timer = None
+                self.timers.cancel(WINDOW_TIMER)
             
             return True
+        
+        # Дубликат ACK: получатель ждет пакет base, а следующие за ним уже доходят
+        if (self.dup_ack_threshold and ack_num == self.base - 1 and
+                self.base < self.next_seq_num):
+            self.dup_acks += 1
+            if self.dup_acks == self.dup_ack_threshold:
+                self.fast_retransmit_pending = True
         return False
     
     def check_timeout(self) -> List[Packet]:
-        if (self.timer is not None and 
-            time.time() - self.timer > self.timeout and 
-            self.base < len(self.packets)):
-            
-            packets_to_resend = []
-            for seq_num in range(self.base, self.next_seq_num):
-                packet = self.packets[seq_num]
-                packet.sent_time = time.time()
-                packets_to_resend.append(packet)
-                
-                self.stats['total_sent'] += 1
-                self.stats['retransmissions'] += 1
+        current_time = self.clock.now()
+        if (self.timers.pop_expired(current_time) and
+            self.packets.has_packet(self.base)):
             
-            if packets_to_resend:
-                self.timer = time.time()
-            
-            return packets_to_resend
+            # Экспоненциальная отсрочка таймера до следующего корректного замера RTT
+            self.timeout_policy.on_timeout()
+            self._on_loss(timeout=True)
+            return self._resend_window(current_time)
         
         return []
     
+    def fast_retransmit(self) -> List[Packet]:
+        # Повторная отправка окна по дубликатам ACK, не дожидаясь таймера
+        if not self.fast_retransmit_pending:
+            return []
+        self.fast_retransmit_pending = False
+        self.stats['fast_retransmits'] += 1
+        self._on_loss(timeout=False)
+        return self._resend_window(self.clock.now())
+    
+    def _resend_window(self, current_time: float) -> List[Packet]:
+        # С управлением перегрузкой сразу повторяется только уменьшенное окно; окно
+        # откатывается к его концу, остальное досылает send_new_packet по мере роста cwnd
+        end = self.next_seq_num
+        if self.congestion is not None:
+            end = min(end, self.base + self._send_window())
+            self.next_seq_num = end
+        packets_to_resend = []
+        for seq_num in range(self.base, end):
+            packets_to_resend.append(self._prepare_packet(seq_num, current_time, True))
+            
+            self.stats['total_sent'] += 1
+            self.stats['retransmissions'] += 1
+        
+        if packets_to_resend:
+            self.timers.start(WINDOW_TIMER, current_time + self.timeout_policy.rto)
+        
+        return packets_to_resend
+    
+    def next_timeout(self) -> Optional[float]:
+        # Момент, когда сработает ближайший таймер (нужен очереди событий)
+        return self.timers.next_deadline()
+    
     def all_packets_confirmed(self) -> bool:
-        return self.base >= len(self.packets)
+        return not self.packets.has_packet(self.base)
     
     def get_protocol_name(self) -> str:
         return "Stop-and-Wait" if self.window_size == 1 else f"Go-Back-N (окно={self.window_size})"
 
 
 class SelectiveRepeatSender(Sender):
-    def __init__(self, data: str, package_data_size: int = 2, window_size: int = 4, timeout: float = 1.0):
-        super().__init__(data, package_data_size, window_size, timeout)
-        self.ack_received = [False] * len(self.packets)  # Отслеживание подтверждений для каждого пакета
-        self.packet_timers = {}  # Индивидуальные таймеры для каждого пакета
+    def __init__(self, data: str, package_data_size: int = 2, window_size: int = 4, timeout: float = 1.0,
+                 clock=None, checksum=None, timeout_policy=None, congestion=None, seq_bits: int = None):
+        super().__init__(data, package_data_size, window_size, timeout, clock, checksum, timeout_policy,
+                         congestion=congestion, seq_bits=seq_bits)
+        # Истекшие пакеты сверх окна перегрузки ждут здесь; их досылает fast_retransmit
+        # по одному на каждый вновь подтвержденный пакет (ACK-тактирование)
+        self.deferred = deque()
+        self.ack_credit = 0
     
     def send_new_packet(self) -> Packet:
         if not self.can_send_new_packet():
             return None
         
-        packet = self.packets[self.next_seq_num]
-        packet.sent_time = time.time()
-        self.packet_timers[self.next_seq_num] = time.time()
+        packet = self._prepare_packet(self.next_seq_num, self.clock.now())
+        # Индивидуальный таймер для каждого пакета
+        self.timers.start(self.next_seq_num, self.clock.now() + self.timeout_policy.rto)
         
         self.next_seq_num += 1
+        self.high_water = self.next_seq_num
         self.stats['total_sent'] += 1
         
         return packet
     
-    def receive_ack(self, ack_num: int) -> bool:
-        if 0 <= ack_num < len(self.packets):
-            self.ack_received[ack_num] = True
-            # Удаляем таймер для подтвержденного пакета
-            if ack_num in self.packet_timers:
-                del self.packet_timers[ack_num]
+    def receive_ack(self, ack_num) -> bool:
+        if isinstance(ack_num, SelectiveAck):
+            return self._receive_selective_ack(ack_num)
+        
+        ack_num = self.sequence.forward(ack_num, self.base)
+        if 0 <= ack_num < self.next_seq_num:
+            if not self.packets.is_acked(ack_num):
+                self._sample_rtt(ack_num)
+                self._on_acked(1)
+            self.packets.set_acked(ack_num)
+            # Отменяем таймер подтвержденного пакета
+            self.timers.cancel(ack_num)
             
             # Сдвигаем базовый номер, если подтверждены все предыдущие пакеты
-            while self.base < len(self.packets) and self.ack_received[self.base]:
+            while self.base < self.next_seq_num and self.packets.is_acked(self.base):
                 self.base += 1
+            self.packets.release(self.base)
             
             return True
         return False
     
-    def check_timeout(self) -> List[Packet]:
-        current_time = time.time()
-        packets_to_resend = []
+    def _receive_selective_ack(self, ack: SelectiveAck) -> bool:
+        # Одно подтверждение закрывает сразу префикс и все отмеченные в карте пакеты
+        newest = None
+        acked = 0
+        cumulative = self.sequence.forward(ack.cumulative, self.base - 1)
+        if cumulative >= self.next_seq_num:
+            return False
+        if cumulative != ack.cumulative:
+            ack = SelectiveAck(cumulative, ack.bitmap)
+        for seq_num in itertools.chain(range(self.base, cumulative + 1), ack.selected()):
+            if seq_num < self.next_seq_num and not self.packets.is_acked(seq_num):
+                self.packets.set_acked(seq_num)
+                self.timers.cancel(seq_num)
+                newest = seq_num
+                acked += 1
         
-        # Проверяем таймауты для всех пакетов в окне
-        for seq_num in range(self.base, min(self.next_seq_num, len(self.packets))):
-            if (seq_num in self.packet_timers and 
-                current_time - self.packet_timers[seq_num] > self.timeout and
-                not self.ack_received[seq_num]):
-                
-                packet = self.packets[seq_num]
-                packet.sent_time = current_time
-                self.packet_timers[seq_num] = current_time
-                packets_to_resend.append(packet)
-                
-                self.stats['total_sent'] += 1
-                self.stats['retransmissions'] += 1
+        if newest is None:
+            return False
+        # Один замер RTT на подтверждение - по самому свежему из подтвержденных пакетов
+        self._sample_rtt(newest)
+        self._on_acked(acked)
         
+        while self.base < self.next_seq_num and self.packets.is_acked(self.base):
+            self.base += 1
+        self.packets.release(self.base)
+        return True
+    
+    def _on_acked(self, acked: int):
+        super()._on_acked(acked)
+        if self.deferred:
+            self.ack_credit += acked
+    
+    def _resend(self, seq_nums, current_time: float) -> List[Packet]:
+        packets_to_resend = []
+        for seq_num in seq_nums:
+            self.timers.start(seq_num, current_time + self.timeout_policy.rto)
+            packets_to_resend.append(self._prepare_packet(seq_num, current_time, True))
+
+            self.stats['total_sent'] += 1
+            self.stats['retransmissions'] += 1
         return packets_to_resend
     
-    def all_packets_confirmed(self) -> bool:
-        return all(self.ack_received) if self.ack_received else True
+    def check_timeout(self) -> List[Packet]:
+        current_time = self.clock.now()
+        
+        expired = [seq_num for seq_num in self.timers.pop_expired(current_time)
+                   if not self.packets.is_acked(seq_num)]
+        if expired:
+            self.timeout_policy.on_timeout()
+            self._on_loss(timeout=True)
+        
+        if self.congestion is not None:
+            # Сразу повторяется не больше cwnd пакетов, остальные откладываются
+            self.deferred.extend(expired)
+            expired = self._take_deferred(self._send_window())
+            self.ack_credit = 0
+        
+        # Из кучи извлекаются только истекшие таймеры, окно целиком не перебирается
+        return self._resend(expired, current_time)
+    
+    def _take_deferred(self, count: int) -> List[int]:
+        taken = []
+        while self.deferred and len(taken) < count:
+            seq_num = self.deferred.popleft()
+            if seq_num >= self.base and not self.packets.is_acked(seq_num):
+                taken.append(seq_num)
+        return taken
+    
+    def fast_retransmit(self) -> List[Packet]:
+        # Быстрой повторной передачи у Selective Repeat нет: после ACK досылаются
+        # отложенные повторы - столько, сколько пакетов подтверждено с прошлого раза
+        if not self.deferred or not self.ack_credit:
+            return []
+        seq_nums = self._take_deferred(self.ack_credit)
+        self.ack_credit = 0
+        return self._resend(seq_nums, self.clock.now())
     
     def get_protocol_name(self) -> str:
         return f"Selective Repeat (окно={self.window_size})"
\ No newline at end of file
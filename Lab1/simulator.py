@@ -1,85 +1,344 @@
-import time
+import heapq
+import itertools
 from sender import Sender, SelectiveRepeatSender
 from receiver import Receiver, SelectiveRepeatReceiver
 from network import NetworkSimulator
+from clock import VirtualClock, make_clock
+from sink import BufferSink, MmapSink, StreamSink
+from fec import FecEncoder, FecDecoder
+from tracing import SEND, RETRANSMIT, DELIVER, ACK, TIMEOUT, ack_number
 
 class ProtocolSimulator:
     def __init__(self, data: str, window_size: int = 1, protocol_type: str = "auto", **kwargs):
         self.data = data
-        
+
         package_data_size = kwargs.get('package_data_size', 2)
         timeout = kwargs.get('timeout', 2.0)
         packet_loss = kwargs.get('packet_loss_prob', 0.2)
         ack_loss = kwargs.get('ack_loss_prob', 0.1)
         corruption = kwargs.get('corruption_prob', 0.1)
-        
+        checksum = kwargs.get('checksum', 'crc32')
+        # "wall" - реальное время (демонстрации), "virtual" - модельное время
+        self.clock = make_clock(kwargs.get('clock', 'wall'))
+        virtual = isinstance(self.clock, VirtualClock)
+        # Параметры канала: задержка в одну сторону, пропускная способность (бит/с), очередь (пакетов)
+        propagation_delay = kwargs.get('propagation_delay', 0.0005 if virtual else 0.0)
+        bandwidth = kwargs.get('bandwidth')
+        queue_capacity = kwargs.get('queue_capacity')
+        # Модель ошибок канала (errors.py); по умолчанию - порча пакета с corruption_prob
+        error_model = kwargs.get('error_model')
+        # Seed генератора канала (None - случайный): одинаковый seed дает тот же прогон бит в бит
+        seed = kwargs.get('seed')
+        # Политика таймаута: "fixed" (по умолчанию), "adaptive" или объект из rto.py
+        timeout_policy = kwargs.get('timeout_policy')
+        # Порог дубликатов ACK для быстрой повторной передачи Go-Back-N (None - выключена)
+        dup_ack_threshold = kwargs.get('dup_ack_threshold')
+        # Selective Repeat: SACK-подтверждения и отложенный ACK (каждые ack_every пакетов
+        # или не позже ack_delay секунд после первого неподтвержденного; при ack_every > 1
+        # без ack_delay - receiver.DEFAULT_ACK_DELAY, при одном ack_delay - только по таймеру)
+        sack = kwargs.get('sack', False)
+        ack_every = kwargs.get('ack_every')
+        ack_delay = kwargs.get('ack_delay')
+        # Управление перегрузкой: None (окно фиксировано), "reno", "cubic"; window_size - верхняя граница
+        congestion = kwargs.get('congestion')
+        # Разрядность номеров пакетов (None - неограниченные номера)
+        seq_bits = kwargs.get('seq_bits')
+        # Прямая коррекция ошибок: пакет четности на каждые fec_group пакетов данных (None - выключена)
+        fec_group = kwargs.get('fec_group')
+        if fec_group is not None and seq_bits is not None:
+            raise ValueError("FEC работает только с неограниченными номерами пакетов")
+
         # Определяем тип протокола автоматически или по указанию
         if protocol_type == "auto":
             if window_size == 1:
                 protocol_type = "stop_and_wait"
             else:
                 protocol_type = "go_back_n"
-        
+
         # Создаем отправителя и получателя в зависимости от типа протокола
         if protocol_type == "selective_repeat":
-            self.sender = SelectiveRepeatSender(data, package_data_size, window_size, timeout)
-            self.receiver = SelectiveRepeatReceiver(package_data_size, window_size)
+            self.sender = SelectiveRepeatSender(data, package_data_size, window_size, timeout, self.clock,
+                                                checksum, timeout_policy, congestion, seq_bits)
         else:
-            self.sender = Sender(data, package_data_size, window_size, timeout)
-            self.receiver = Receiver(package_data_size)
-            
-        self.network = NetworkSimulator(packet_loss, ack_loss, corruption)
-        
+            self.sender = Sender(data, package_data_size, window_size, timeout, self.clock, checksum,
+                                 timeout_policy, dup_ack_threshold, congestion, seq_bits)
+
+        # Выходной буфер выделяется заранее, если размер передачи известен
+        capacity = self.sender.packets.size_hint
+        output_path = kwargs.get('output_path')
+        # Файловый объект для долгих сессий: данные пишутся по порядку и не копятся в памяти
+        output_stream = kwargs.get('output_stream')
+        if output_stream is not None:
+            self.sink = StreamSink(output_stream, package_data_size)
+        elif output_path is not None:
+            self.sink = MmapSink(output_path, package_data_size, capacity or 0)
+        else:
+            self.sink = BufferSink(package_data_size, capacity)
+
+        if protocol_type == "selective_repeat":
+            self.receiver = SelectiveRepeatReceiver(package_data_size, window_size, self.sink, sack, ack_every,
+                                                    ack_delay, self.clock, seq_bits)
+        else:
+            self.receiver = Receiver(package_data_size, self.sink, seq_bits)
+
+        # Канал может быть общим для нескольких потоков (multiflow.py)
+        self.network = kwargs.get('network')
+        if self.network is None:
+            self.network = NetworkSimulator(packet_loss, ack_loss, corruption, propagation_delay, bandwidth,
+                                            queue_capacity, self.clock, error_model, seed)
+
+        # Кодер четности стоит между отправителем и каналом, декодер - перед получателем
+        self.fec_encoder = None
+        self.fec_decoder = None
+        if fec_group is not None:
+            self.fec_encoder = FecEncoder(fec_group, package_data_size, checksum)
+            self.fec_decoder = FecDecoder(fec_group, package_data_size, checksum,
+                                          in_order=protocol_type != "selective_repeat")
+
+        # Трассировка событий (tracing.Tracer): отправитель, канал и получатель пишут в один буфер
+        self.tracer = kwargs.get('tracer')
+        if self.tracer is not None:
+            self.network.tracer = self.tracer
+
         self.stats = {
             'protocol': self.sender.get_protocol_name(),
             'iterations': 0,
             'total_time': 0,
             'efficiency': 0,
             'total_sent': 0,
-            'retransmissions': 0
+            'retransmissions': 0,
+            'fast_retransmits': 0,
+            'acks_sent': 0,
+            'queue_drops': 0,
+            'parity_sent': 0,
+            'fec_recovered': 0,
+            'cwnd': []
         }
-    
+
     def run_simulation(self) -> bool:
-        start_time = time.time()
+        start_time = self.clock.now()
+        self.acks_sent = 0
+
+        if isinstance(self.clock, VirtualClock):
+            iteration = self._run_event_queue()
+        else:
+            iteration = self._run_wall_clock()
+
+        self.stats['iterations'] = iteration
+        self.stats['total_time'] = self.clock.now() - start_time
+        # Пакеты четности - тоже передачи: входят в total_sent и в эффективность
+        if self.fec_encoder is not None:
+            self.stats['parity_sent'] = self.fec_encoder.parity_sent
+            self.stats['fec_recovered'] = self.fec_decoder.recovered
+        self.stats['total_sent'] = self.sender.stats['total_sent'] + self.stats['parity_sent']
+        self.stats['retransmissions'] = self.sender.stats['retransmissions']
+        self.stats['fast_retransmits'] = self.sender.stats['fast_retransmits']
+        self.stats['acks_sent'] = self.acks_sent
+        self.stats['queue_drops'] = self.network.queue_drops
+        self.stats['cwnd'] = self.sender.stats['cwnd']
+        packets = self.sender.packets
+        useful_packets = packets.total_bytes // self.sender.package_data_size
+
+        if useful_packets > 0:
+            self.stats['efficiency'] = useful_packets / self.stats['total_sent']
+        else:
+            self.stats['efficiency'] = 0
+
+        success = self.verify_output()
+        # Выходной файл закрывается сразу: прогоны перебора не держат дескрипторы и отображения
+        self.close()
+
+        return success
+
+    def close(self):
+        """Сброс и закрытие приемника (выходной файл MmapSink, сброс потока StreamSink)"""
+        self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def verify_output(self) -> bool:
+        # Потоковый приемник данные не хранит - сверяем длину и SHA-256
+        packets = self.sender.packets
+        if isinstance(self.sink, StreamSink):
+            return packets.verify_digest(self.sink.length, self.sink.digest.digest())
+        return packets.verify(self.receiver.get_reassembled_data())
+
+    def _transmit_new(self, packet):
+        # Новый пакет данных; после каждой полной группы (и в конце данных) - пакет четности
+        self.network.transmit_packet(packet)
+        if self.sender.packets.was_retransmitted(self.sender.next_seq_num - 1):
+            return  # Досылка откатанного окна Go-Back-N: четность группы уже посчитана
+        parity = self.fec_encoder.on_send(packet)
+        if parity is None and not self.sender.packets.has_packet(self.sender.next_seq_num):
+            parity = self.fec_encoder.flush()
+        if parity is not None:
+            self.network.transmit_packet(parity)
+
+    def _receive(self, packet):
+        # Декодер FEC пропускает пакет данных и добавляет восстановленные по четности
+        if isinstance(self.receiver, SelectiveRepeatReceiver):
+            floor = self.receiver.base_seq
+        else:
+            floor = self.receiver.expected_seq_num
+        return [self.receiver.receive_packet(packet) for packet in self.fec_decoder.on_receive(packet, floor)]
+
+    def _trace_sent(self, kind: int, packets):
+        # Отправка и повтор; значение - заполненность окна отправителя
+        occupancy = self.sender.next_seq_num - self.sender.base
+        now = self.clock.now()
+        for packet in packets:
+            self.tracer.record(now, kind, packet.seq_num, occupancy)
+
+    def _trace_timeout(self, packets):
+        # Срабатывание таймера: номер base и число пакетов повтора
+        self.tracer.record(self.clock.now(), TIMEOUT, self.sender.sequence.wire(self.sender.base), len(packets))
+        self._trace_sent(RETRANSMIT, packets)
+
+    def _trace_ack(self, ack_num):
+        self.tracer.record(self.clock.now(), ACK, ack_number(ack_num), self.sender.next_seq_num - self.sender.base)
+
+    def _run_wall_clock(self) -> int:
         iteration = 0
-        
+        transmit_new = self._transmit_new if self.fec_encoder is not None else self.network.transmit_packet
+        tracing = self.tracer is not None
+
         while not self.sender.all_packets_confirmed():
             iteration += 1
 
             # Проверка таймаутов и повторная отправка
             resent_packets = self.sender.check_timeout()
+            if tracing and resent_packets:
+                self._trace_timeout(resent_packets)
             for packet in resent_packets:
                 self.network.transmit_packet(packet)
-            
+
             # Отправка новых пакетов
             while self.sender.can_send_new_packet():
                 packet = self.sender.send_new_packet()
                 if packet:
-                    self.network.transmit_packet(packet)
+                    if tracing:
+                        self._trace_sent(SEND, (packet,))
+                    transmit_new(packet)
+
+            # Обработка пакетов, дошедших до получателя
+            for packet in self.network.deliver_ready(self.clock.now()):
+                if tracing:
+                    self.tracer.record(self.clock.now(), DELIVER, packet.seq_num)
+                results = self._receive(packet) if self.fec_decoder is not None else \
+                    (self.receiver.receive_packet(packet),)
+                for success, ack_num in results:
+                    if success:
+                        # ACK отправляется только на неповрежденные пакеты (в том числе дубликаты ACK)
+                        self._send_ack(ack_num)
             
-            # Обработка пакетов в сети
-            for packet in self.network.packets_in_transit[:]:
-                success, ack_num = self.receiver.receive_packet(packet)
-                if success:
-                    # ACK отправляется только если пакет успешно принят
-                    if self.network.transmit_ack(ack_num):
-                        self.sender.receive_ack(ack_num)
-                # Пакет удаляется из сети после обработки
-                self.network.packets_in_transit.remove(packet)
+            # Отложенное подтверждение, срок которого истек
+            ack = self.receiver.flush_ack(self.clock.now())
+            if ack is not None:
+                self._send_ack(ack)
+
+            self.clock.sleep(0.001)
+
+        return iteration
+
+    def _send_ack(self, ack_num):
+        self.acks_sent += 1
+        if self.network.transmit_ack(ack_num):
+            self.sender.receive_ack(ack_num)
+            resent_packets = self.sender.fast_retransmit()
+            if self.tracer is not None:
+                self._trace_ack(ack_num)
+                self._trace_sent(RETRANSMIT, resent_packets)
+            for packet in resent_packets:
+                self.network.transmit_packet(packet)
+
+    def _run_event_queue(self) -> int:
+        # Дискретно-событийное моделирование: события упорядочены по виртуальному времени.
+        # Приход пакетов данных берется из очереди канала, остальные события - из кучи
+        events = []
+        counter = itertools.count()  # Порядок событий с одинаковым временем
+        network = self.network
+        transmit = network.transmit_packet
+        transmit_new = self._transmit_new if self.fec_encoder is not None else transmit
+        fec = self.fec_decoder is not None
+        tracing = self.tracer is not None
+        scheduled_timeout = None
+        scheduled_flush = None
+        processed = 0
+
+        def schedule(timestamp, kind, payload=None):
+            heapq.heappush(events, (timestamp, next(counter), kind, payload))
+
+        def send_ack(timestamp, ack_num):
+            self.acks_sent += 1
+            if network.transmit_ack(ack_num):
+                schedule(timestamp + network.propagation_delay, 'ack', ack_num)
+
+        schedule(self.clock.now(), 'send')
+
+        while not self.sender.all_packets_confirmed():
+            arrival = network.next_arrival()
+            if events and (arrival is None or events[0][0] <= arrival):
+                timestamp, _, kind, payload = heapq.heappop(events)
+            elif arrival is not None:
+                timestamp, kind = arrival, 'deliver'
+            else:
+                break
+            self.clock.advance_to(timestamp)
+            processed += 1
+
+            if kind == 'deliver':
+                for packet in network.deliver_ready(timestamp):
+                    if tracing:
+                        self.tracer.record(timestamp, DELIVER, packet.seq_num)
+                    if fec:
+                        for success, ack_num in self._receive(packet):
+                            if success:
+                                send_ack(timestamp, ack_num)
+                        continue
+                    success, ack_num = self.receiver.receive_packet(packet)
+                    if success:
+                        send_ack(timestamp, ack_num)
+            elif kind == 'flush':
+                ack = self.receiver.flush_ack(timestamp)
+                if ack is not None:
+                    send_ack(timestamp, ack)
+            elif kind == 'ack':
+                self.sender.receive_ack(payload)
+                resent_packets = self.sender.fast_retransmit()
+                if tracing:
+                    self._trace_ack(payload)
+                    self._trace_sent(RETRANSMIT, resent_packets)
+                for packet in resent_packets:
+                    transmit(packet)
+            elif kind == 'timeout':
+                resent_packets = self.sender.check_timeout()
+                if tracing and resent_packets:
+                    self._trace_timeout(resent_packets)
+                for packet in resent_packets:
+                    transmit(packet)
+
+            # После любого события окно могло сдвинуться - досылаем новые пакеты
+            while self.sender.can_send_new_packet():
+                packet = self.sender.send_new_packet()
+                if packet:
+                    if tracing:
+                        self._trace_sent(SEND, (packet,))
+                    transmit_new(packet)
+
+            # Планируем проверку таймера, если его срок изменился
+            deadline = self.sender.next_timeout()
+            if deadline is not None and deadline != scheduled_timeout:
+                schedule(deadline, 'timeout')
+                scheduled_timeout = deadline
             
-            time.sleep(0.001) 
-        
-        self.stats['iterations'] = iteration
-        self.stats['total_time'] = time.time() - start_time
-        self.stats['total_sent'] = self.sender.stats['total_sent']
-        useful_packets = len(self.data) // self.sender.package_data_size
-        
-        if useful_packets > 0:
-            self.stats['efficiency'] = useful_packets / self.sender.stats['total_sent']
-        else:
-            self.stats['efficiency'] = 0
-    
-        received_data = self.receiver.get_reassembled_data()
-        success = self.data == received_data
-        
-        return success
\ No newline at end of file
+            # Отложенное подтверждение получателя
+            flush_at = self.receiver.ack_deadline()
+            if flush_at is not None and flush_at != scheduled_flush:
+                schedule(flush_at, 'flush')
+                scheduled_flush = flush_at
+
+        return processed
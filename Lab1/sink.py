@@ -0,0 +1,96 @@
+import hashlib
+import mmap
+
+
+class BufferSink:
+    """Приемник данных поверх заранее выделенного bytearray
+
+    Сегмент с номером seq_num пишется сразу по смещению seq_num * package_data_size,
+    поэтому сборка не требует ни сортировки, ни склейки. Если размер передачи
+    неизвестен, буфер растет по мере записи.
+    """
+
+    def __init__(self, package_data_size: int = 2, capacity: int = None):
+        self.package_data_size = package_data_size
+        self.buffer = bytearray(capacity or 0)
+        self.length = 0
+
+    def write(self, seq_num: int, data: bytes):
+        offset = seq_num * self.package_data_size
+        end = offset + len(data)
+        if end > len(self.buffer):
+            self.buffer.extend(bytes(end - len(self.buffer)))
+        self.buffer[offset:end] = data
+        if end > self.length:
+            self.length = end
+
+    def view(self) -> memoryview:
+        return memoryview(self.buffer)[:self.length]
+
+    def close(self):
+        pass
+
+
+class MmapSink:
+    """Приемник, пишущий сегменты прямо в отображенный в память выходной файл"""
+
+    def __init__(self, path: str, package_data_size: int, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Для MmapSink нужен известный положительный размер передачи")
+        self.package_data_size = package_data_size
+        self.length = 0
+        self.file = open(path, 'w+b')
+        self.file.truncate(capacity)
+        self.buffer = mmap.mmap(self.file.fileno(), capacity)
+
+    def write(self, seq_num: int, data: bytes):
+        offset = seq_num * self.package_data_size
+        end = offset + len(data)
+        if end > len(self.buffer):
+            raise ValueError(f"Сегмент {seq_num} выходит за пределы выходного файла")
+        self.buffer[offset:end] = data
+        if end > self.length:
+            self.length = end
+
+    def view(self) -> memoryview:
+        return memoryview(self.buffer)[:self.length]
+
+    def close(self):
+        # Перед закрытием все memoryview на буфер должны быть освобождены
+        if self.buffer.closed:
+            return
+        self.buffer.flush()
+        self.buffer.close()
+        self.file.close()
+
+
+class StreamSink:
+    """Приемник для долгих сессий: сегменты по порядку пишутся в файловый объект
+
+    Оба получателя выдают сегменты строго по возрастанию номеров, поэтому
+    смещения не нужны. В памяти остаются только длина и SHA-256 записанного
+    потока - ими и проверяется результат.
+    """
+
+    def __init__(self, fileobj=None, package_data_size: int = 2):
+        self.file = fileobj  # None - данные только учитываются, но никуда не пишутся
+        self.package_data_size = package_data_size
+        self.length = 0
+        self.next_seq_num = 0
+        self.digest = hashlib.sha256()
+
+    def write(self, seq_num: int, data: bytes):
+        if seq_num != self.next_seq_num:
+            raise ValueError(f"StreamSink ожидает сегмент {self.next_seq_num}, получен {seq_num}")
+        if self.file is not None:
+            self.file.write(data)
+        self.digest.update(data)
+        self.length += len(data)
+        self.next_seq_num += 1
+
+    def view(self) -> memoryview:
+        raise ValueError("StreamSink не хранит данные; проверка - по длине и SHA-256")
+
+    def close(self):
+        if self.file is not None:
+            self.file.flush()
@@ -0,0 +1,99 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import numpy as np
+from simulator import ProtocolSimulator
+
+
+def expand_grid(grid) -> List[Dict]:
+    """Декартово произведение сетки параметров в фиксированном порядке ключей"""
+    if isinstance(grid, dict):
+        keys = list(grid.keys())
+        return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+    return [dict(point) for point in grid]
+
+
+def spawn_seeds(seed, count: int) -> List[int]:
+    # Независимые потоки случайных чисел для каждой точки сетки
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def run_point(params: Dict, seed: int) -> Dict:
+    """Один прогон ProtocolSimulator; вызывается в процессе-исполнителе"""
+    kwargs = dict(params)
+    data = kwargs.pop('data')
+    # Seed точки уходит в собственный генератор канала, глобальный random не трогается
+    simulator = ProtocolSimulator(data, seed=seed, **kwargs)
+    success = simulator.run_simulation()
+
+    # Размер - по таблице пакетов: байты, а не символы строки; годится и для файлов, и для итераторов
+    data_size = simulator.sender.packets.total_bytes
+    useful_packets = data_size // simulator.sender.package_data_size
+    row = {key: value for key, value in params.items() if key != 'data'}
+    row.update({
+        'data_size': data_size,
+        'seed': seed,
+        'success': success,
+        'protocol': simulator.stats['protocol'],
+        'total_time': simulator.stats['total_time'],
+        'total_sent': simulator.stats['total_sent'],
+        'retransmissions': simulator.stats['retransmissions'],
+        'fast_retransmits': simulator.stats['fast_retransmits'],
+        'acks_sent': simulator.stats['acks_sent'],
+        'queue_drops': simulator.stats['queue_drops'],
+        'parity_sent': simulator.stats['parity_sent'],
+        'fec_recovered': simulator.stats['fec_recovered'],
+        'cwnd': simulator.stats['cwnd'],
+        'efficiency': simulator.stats['efficiency'],
+        'k': simulator.stats['total_sent'] / useful_packets if useful_packets > 0 else 0
+    })
+    return row
+
+
+def run_sweep(grid, workers: int = None, seed=None, cache=None, seeds: List[int] = None, **fixed) -> List[Dict]:
+    """Прогон сетки параметров на пуле процессов
+
+    grid - словарь списков значений (декартово произведение) или список готовых точек.
+    fixed - параметры, общие для всех точек (data, timeout, clock, ...).
+    cache - ResultCache (cache.py): готовые точки берутся из него, считаются только новые.
+    seeds - готовые seed точек вместо порождаемых из seed (продолжение серии повторов).
+    Результаты возвращаются в порядке точек сетки независимо от порядка завершения.
+    """
+    fixed.setdefault('clock', 'virtual')
+    points = [{**fixed, **point} for point in expand_grid(grid)]
+    if seeds is None:
+        if cache is not None and seed is None:
+            seed = cache.seed
+        seeds = spawn_seeds(seed, len(points))
+    elif len(seeds) != len(points):
+        raise ValueError("Число seed не совпадает с числом точек")
+
+    rows = [None] * len(points)
+    keys = [None] * len(points)
+    if cache is not None:
+        for i, (point, point_seed) in enumerate(zip(points, seeds)):
+            keys[i] = cache.key(point, point_seed)
+            rows[i] = cache.get(keys[i])
+    pending = [i for i, row in enumerate(rows) if row is None]
+
+    for i, row in zip(pending, _run_points([points[i] for i in pending], [seeds[i] for i in pending], workers)):
+        rows[i] = row
+        if cache is not None:
+            cache.put(keys[i], points[i], row)
+    if cache is not None:
+        cache.commit()
+    return rows
+
+
+def _run_points(points: List[Dict], seeds: List[int], workers: int = None) -> List[Dict]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(points) <= 1:
+        return [run_point(point, point_seed) for point, point_seed in zip(points, seeds)]
+
+    workers = min(workers, len(points))
+    chunksize = max(1, len(points) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_point, points, seeds, chunksize=chunksize))
@@ -0,0 +1,22 @@
+from errors import GilbertElliottModel, BurstLossModel, BatchedRandom
+from simulator import ProtocolSimulator
+
+
+def test_zero_transition_probability_stays_in_state():
+    model = GilbertElliottModel(0.0, 0.1, ber_good=0.0, ber_bad=0.5, rng=BatchedRandom(1))
+    data = bytes(100)
+    assert all(model.apply(data) == data for _ in range(10))
+    assert not model.bad
+    assert model.mean_ber() == 0.0
+
+    model = GilbertElliottModel(0.0, 0.0, ber_good=0.01, ber_bad=0.5)
+    assert model.mean_ber() == 0.01
+    burst = BurstLossModel(0.0, 0.0, loss_good=0.1)
+    assert burst.mean_loss() == 0.1
+
+
+def test_zero_transition_probability_in_simulation():
+    simulator = ProtocolSimulator("HelloWorld" * 10, 4, "selective_repeat", clock='virtual', timeout=0.2,
+                                  packet_loss_prob=0.0, ack_loss_prob=0.0, seed=0,
+                                  error_model=GilbertElliottModel(0.0, 0.1, 1e-3, 0.5))
+    assert simulator.run_simulation()
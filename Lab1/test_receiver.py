@@ -0,0 +1,25 @@
+from simulator import ProtocolSimulator
+
+DATA = "HelloWorld" * 18  # 90 пакетов по 2 байта
+
+
+def _acks(**kwargs) -> int:
+    simulator = ProtocolSimulator(DATA, 8, "selective_repeat", clock='virtual', packet_loss_prob=0.0,
+                                  ack_loss_prob=0.0, corruption_prob=0.0, timeout=0.2, seed=0, **kwargs)
+    assert simulator.run_simulation()
+    assert simulator.stats['retransmissions'] == 0
+    return simulator.stats['acks_sent']
+
+
+def test_ack_delay_alone_coalesces_acks():
+    assert _acks() == 90
+    assert _acks(ack_delay=0.01) < 90
+
+
+def test_ack_every_flushes_tail_without_timeout():
+    simulator = ProtocolSimulator("HelloWorld" * 2 + "H", 4, "selective_repeat", clock='virtual',
+                                  packet_loss_prob=0.0, ack_loss_prob=0.0, corruption_prob=0.0, timeout=0.2,
+                                  ack_every=4, seed=0)
+    assert simulator.run_simulation()
+    assert simulator.stats['retransmissions'] == 0
+    assert simulator.stats['total_time'] < 0.2
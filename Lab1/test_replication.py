@@ -0,0 +1,24 @@
+import math
+from replication import run_replicated
+
+GRID = {'window_size': [2, 4, 8]}
+FIXED = dict(data="HelloWorld" * 10, protocol_type="go_back_n", package_data_size=5, timeout=0.2,
+             packet_loss_prob=0.2, ack_loss_prob=0.1, workers=1, seed=1)
+
+
+def test_budget_is_shared_between_points():
+    rows = run_replicated(GRID, target_width=0.001, budget=12, **FIXED)
+    assert [row['replications'] for row in rows] == [4, 4, 4]
+
+
+def test_budget_below_min_replications():
+    # 6 прогонов на 3 точки при min_replications=5: каждой по 2, а не 5/1/0
+    rows = run_replicated(GRID, budget=6, **FIXED)
+    assert [row['replications'] for row in rows] == [2, 2, 2]
+    assert all(not math.isnan(row['k']) for row in rows)
+
+    rows = run_replicated(GRID, budget=4, **FIXED)
+    assert [row['replications'] for row in rows] == [2, 1, 1]
+    for row in rows[1:]:
+        assert not row['converged']
+        assert math.isnan(row['k']) and math.isnan(row['k_ci'])
@@ -0,0 +1,36 @@
+from clock import VirtualClock
+from congestion import RenoCongestionControl
+from sender import SelectiveRepeatSender, CWND_HISTORY
+
+
+def test_selective_repeat_timeout_resend_limited_by_cwnd():
+    clock = VirtualClock()
+    sender = SelectiveRepeatSender(bytes(32), 2, 8, timeout=0.2, clock=clock,
+                                   congestion=RenoCongestionControl(initial_window=8))
+    sent = [sender.send_new_packet() for _ in range(8)]
+    assert all(sent)
+
+    clock.advance_to(0.5)
+    resent = sender.check_timeout()
+    # Таймаут сбрасывает cwnd до 1: сразу повторяется один пакет, семь ждут подтверждений
+    assert sender.congestion.window == 1
+    assert [packet.seq_num for packet in resent] == [0]
+    assert len(sender.deferred) == 7
+
+    sender.receive_ack(0)
+    assert [packet.seq_num for packet in sender.fast_retransmit()] == [1]
+    sender.receive_ack(1)
+    assert [packet.seq_num for packet in sender.fast_retransmit()] == [2]
+
+
+def test_cwnd_trajectory_is_bounded():
+    clock = VirtualClock()
+    sender = SelectiveRepeatSender(bytes(32), 2, 8, clock=clock, congestion="reno")
+    for step in range(20 * CWND_HISTORY):
+        clock.advance_to(step)
+        sender.congestion.cwnd = step % 50 + 1
+        sender._record_cwnd()
+    trajectory = sender.stats['cwnd']
+    assert len(trajectory) <= CWND_HISTORY
+    assert trajectory[0] == (0.0, 1.0)
+    assert trajectory[-1] == (20 * CWND_HISTORY - 1, sender.congestion.cwnd)
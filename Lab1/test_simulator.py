@@ -0,0 +1,33 @@
+import io
+from simulator import ProtocolSimulator
+from multiflow import MultiFlowSimulator
+
+DATA = b"HelloWorld" * 30
+
+
+def test_output_file_closed_after_run(tmp_path):
+    path = tmp_path / "out.bin"
+    simulator = ProtocolSimulator(DATA, 4, "selective_repeat", clock='virtual', timeout=0.2, seed=0,
+                                  output_path=str(path))
+    assert simulator.run_simulation()
+    assert simulator.sink.file.closed and simulator.sink.buffer.closed
+    with open(path, 'rb') as f:
+        assert f.read() == DATA
+
+
+def test_output_stream_flushed_after_run():
+    stream = io.BytesIO()
+    simulator = ProtocolSimulator(DATA, 4, "go_back_n", clock='virtual', timeout=0.2, seed=0,
+                                  output_stream=stream)
+    assert simulator.run_simulation()
+    assert stream.getvalue() == DATA
+
+
+def test_multiflow_closes_output_files(tmp_path):
+    paths = [tmp_path / f"flow{i}.bin" for i in range(2)]
+    simulator = MultiFlowSimulator([{'data': DATA, 'window_size': 4, 'output_path': str(path)} for path in paths],
+                                   timeout=0.2, seed=0)
+    assert simulator.run_simulation()
+    for flow, path in zip(simulator.flows, paths):
+        assert flow.sink.file.closed
+        assert path.read_bytes() == DATA
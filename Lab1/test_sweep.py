@@ -0,0 +1,36 @@
+from errors import GilbertElliottModel
+from sweep import run_sweep
+
+DATA = "HelloWorld" * 20
+GRID = {'protocol_type': ["go_back_n", "selective_repeat"], 'window_size': [4, 8]}
+FIXED = dict(data=DATA, package_data_size=5, timeout=0.2, packet_loss_prob=0.05, ack_loss_prob=0.05)
+
+
+def _model():
+    return GilbertElliottModel(0.01, 0.2, 0.0, 0.05)
+
+
+def test_error_model_repeats_with_same_seed():
+    model = _model()
+    runs = [[row['total_sent'] for row in run_sweep(GRID, workers=1, seed=5, error_model=model, **FIXED)]
+            for _ in range(3)]
+    assert runs[0] == runs[1] == runs[2]
+    # Состояние переданной модели не меняется прогонами
+    assert model.rng is None and model.remaining is None
+
+
+def test_serial_and_parallel_rows_equal_with_error_model():
+    serial = run_sweep(GRID, workers=1, seed=5, error_model=_model(), **FIXED)
+    parallel = run_sweep(GRID, workers=4, seed=5, error_model=_model(), **FIXED)
+    assert all(row['success'] for row in serial)
+    assert [row['total_sent'] for row in serial] == [row['total_sent'] for row in parallel]
+    assert [row['total_time'] for row in serial] == [row['total_time'] for row in parallel]
+
+
+def test_run_point_counts_bytes_of_any_source():
+    text = "Привет" * 10  # 60 символов, 120 байт
+    rows = run_sweep([{'data': text}, {'data': iter([text.encode()])}], workers=1, seed=1,
+                     protocol_type="selective_repeat", window_size=4, package_data_size=4, timeout=0.2)
+    assert all(row['success'] for row in rows)
+    assert [row['data_size'] for row in rows] == [120, 120]
+    assert rows[0]['k'] == rows[0]['total_sent'] / 30
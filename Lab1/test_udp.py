@@ -0,0 +1,9 @@
+import pytest
+from tracing import Tracer
+from udp import run_transfer
+
+
+@pytest.mark.parametrize('option', [{'fec_group': 4}, {'tracer': Tracer()}])
+def test_unsupported_options_are_rejected(option):
+    with pytest.raises(ValueError):
+        run_transfer(b"HelloWorld", 4, "selective_repeat", **option)
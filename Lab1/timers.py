@@ -0,0 +1,59 @@
+import heapq
+from typing import Dict, Hashable, List, Optional
+
+
+class TimerHeap:
+    """Набор таймеров на min-куче с ленивой отменой
+
+    Запуск и перезапуск таймера - O(log n), отмена - O(1): запись в куче остается,
+    но считается устаревшей, если срок в словаре активных таймеров с ней не совпадает.
+    Проверка истечения смотрит только на вершину кучи и возвращает лишь
+    истекшие ключи, не перебирая всё окно.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines: Dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key) -> bool:
+        return key in self._deadlines
+
+    def start(self, key, deadline: float):
+        # Перезапуск просто добавляет новую запись; старая станет устаревшей
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+
+    def cancel(self, key):
+        self._deadlines.pop(key, None)
+
+    def deadline(self, key) -> Optional[float]:
+        return self._deadlines.get(key)
+
+    def next_deadline(self) -> Optional[float]:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now: float) -> List:
+        expired = []
+        heap, deadlines = self._heap, self._deadlines
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            if deadlines.get(key) == deadline:
+                del deadlines[key]
+                expired.append(key)
+        return expired
+
+    def _prune(self):
+        heap, deadlines = self._heap, self._deadlines
+        while heap and deadlines.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _compact(self):
+        # Выбрасываем накопившиеся устаревшие записи
+        self._heap = [(deadline, key) for key, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
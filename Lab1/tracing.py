@@ -0,0 +1,114 @@
+import csv
+import json
+from array import array
+from packet import SelectiveAck
+
+# Коды событий (в буфере хранится один байт на событие)
+SEND = 0
+RETRANSMIT = 1
+DROP = 2
+QUEUE_DROP = 3
+CORRUPT = 4
+DELIVER = 5
+ACK = 6
+ACK_LOST = 7
+TIMEOUT = 8
+
+EVENT_NAMES = ('send', 'retransmit', 'drop', 'queue_drop', 'corrupt', 'deliver', 'ack', 'ack_lost', 'timeout')
+
+# Дорожки на временной шкале Chrome trace: отправитель, канал, получатель
+SENDER_LANE = 1
+CHANNEL_LANE = 2
+RECEIVER_LANE = 3
+EVENT_LANES = (SENDER_LANE, SENDER_LANE, CHANNEL_LANE, CHANNEL_LANE, CHANNEL_LANE, RECEIVER_LANE,
+               SENDER_LANE, CHANNEL_LANE, SENDER_LANE)
+# События, у которых value - заполненность окна отправителя
+WINDOW_EVENTS = (SEND, RETRANSMIT, ACK)
+
+
+def ack_number(ack) -> int:
+    # Для SACK на шкалу попадает кумулятивная часть
+    return ack.cumulative if isinstance(ack, SelectiveAck) else ack
+
+
+class Tracer:
+    """Кольцевой буфер событий моделирования фиксированного размера
+
+    Память выделяется один раз: время, код события, номер пакета и значение
+    (заполненность окна, число пакетов повтора) лежат в плоских массивах.
+    При переполнении старые события перезаписываются, их число - в dropped.
+    Трассировка включается передачей Tracer в ProtocolSimulator(tracer=...);
+    без него в цикле остается только проверка на None.
+    """
+
+    def __init__(self, capacity: int = 1 << 16):
+        if capacity < 1:
+            raise ValueError("Емкость буфера трассировки должна быть положительной")
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.kinds = bytearray(capacity)
+        self.seqs = array('q', bytes(8 * capacity))
+        self.values = array('q', bytes(8 * capacity))
+        self.index = 0
+        self.count = 0
+
+    def record(self, timestamp: float, kind: int, seq_num: int = -1, value: int = 0):
+        i = self.index
+        self.times[i] = timestamp
+        self.kinds[i] = kind
+        self.seqs[i] = seq_num
+        self.values[i] = value
+        self.index = i + 1 if i + 1 < self.capacity else 0
+        self.count += 1
+
+    @property
+    def dropped(self) -> int:
+        return max(0, self.count - self.capacity)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def entries(self):
+        """События в порядке записи: (время, код события, номер пакета, значение)"""
+        start = self.index if self.count > self.capacity else 0
+        for offset in range(len(self)):
+            i = (start + offset) % self.capacity
+            yield self.times[i], self.kinds[i], self.seqs[i], self.values[i]
+
+    def events(self):
+        # То же с именами событий вместо кодов
+        for timestamp, kind, seq_num, value in self.entries():
+            yield timestamp, EVENT_NAMES[kind], seq_num, value
+
+    def clear(self):
+        self.index = 0
+        self.count = 0
+
+
+def export_csv(tracer: Tracer, path: str):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['time', 'event', 'seq_num', 'value'])
+        writer.writerows(tracer.events())
+
+
+def export_chrome_trace(tracer: Tracer, path: str):
+    """Формат Trace Event (chrome://tracing, Perfetto)
+
+    События - мгновенные отметки на дорожках отправителя, канала и получателя,
+    заполненность окна - счетчик window. Время - в микросекундах.
+    """
+    trace_events = [
+        {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': lane, 'args': {'name': name}}
+        for lane, name in ((SENDER_LANE, 'sender'), (CHANNEL_LANE, 'channel'), (RECEIVER_LANE, 'receiver'))
+    ]
+    for timestamp, kind, seq_num, value in tracer.entries():
+        ts = timestamp * 1e6
+        trace_events.append({'name': EVENT_NAMES[kind], 'ph': 'i', 's': 't', 'ts': ts, 'pid': 1, 'tid': EVENT_LANES[kind],
+                             'args': {'seq_num': seq_num, 'value': value}})
+        if kind in WINDOW_EVENTS:
+            trace_events.append({'name': 'window', 'ph': 'C', 'ts': ts, 'pid': 1, 'args': {'occupancy': value}})
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms',
+                   'otherData': {'dropped_events': tracer.dropped}}, f)
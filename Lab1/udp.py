@@ -0,0 +1,256 @@
+import asyncio
+import os
+import struct
+from packet import Packet, SelectiveAck
+from clock import LoopClock
+from simulator import ProtocolSimulator
+
+# Типы кадров
+FRAME_DATA = 1
+FRAME_ACK = 2
+FRAME_SACK = 3
+
+DATA_HEADER = struct.Struct('!BQQ')  # Тип, номер пакета, контрольная сумма; дальше - данные
+ACK_HEADER = struct.Struct('!Bq')  # Тип, номер подтверждения (-1 - еще ничего не принято); дальше - карта SACK
+LOCALHOST = '127.0.0.1'
+
+
+def encode_packet(packet: Packet) -> bytes:
+    return DATA_HEADER.pack(FRAME_DATA, packet.seq_num, packet.hash_sum) + packet.data
+
+
+def encode_ack(ack) -> bytes:
+    if isinstance(ack, SelectiveAck):
+        bitmap = ack.bitmap.to_bytes((ack.bitmap.bit_length() + 7) // 8, 'big')
+        return ACK_HEADER.pack(FRAME_SACK, ack.cumulative) + bitmap
+    return ACK_HEADER.pack(FRAME_ACK, ack)
+
+
+def decode_frame(frame: bytes, checksum=None):
+    """Кадр данных -> Packet, кадр подтверждения -> номер или SelectiveAck"""
+    kind = frame[0]
+    if kind == FRAME_DATA:
+        _, seq_num, hash_sum = DATA_HEADER.unpack_from(frame)
+        return Packet(seq_num, frame[DATA_HEADER.size:], hash_sum, checksum)
+    _, ack_num = ACK_HEADER.unpack_from(frame)
+    if kind == FRAME_SACK:
+        return SelectiveAck(ack_num, int.from_bytes(frame[ACK_HEADER.size:], 'big'))
+    return ack_num
+
+
+class _Endpoint(asyncio.DatagramProtocol):
+    """Общая часть узлов: сокет и один переставляемый таймер цикла событий"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.transport = None
+        self.timer = None
+        self.timer_deadline = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def error_received(self, exc):
+        # ICMP-ошибки (например, порт еще не открыт) - обычная потеря для ARQ
+        pass
+
+    def _set_timer(self, deadline, callback):
+        if deadline == self.timer_deadline:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = self.loop.call_at(deadline, callback) if deadline is not None else None
+        self.timer_deadline = deadline
+
+    def _timer_fired(self):
+        self.timer = None
+        self.timer_deadline = None
+
+    def close(self):
+        self._set_timer(None, None)
+        if self.transport is not None:
+            self.transport.close()
+
+
+class SenderEndpoint(_Endpoint):
+    def __init__(self, loop, sender, remote_addr, done: asyncio.Future):
+        super().__init__(loop)
+        self.sender = sender
+        self.remote_addr = remote_addr
+        self.done = done
+        self.frames_sent = 0
+        self.acks_received = 0
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self._pump()
+
+    def datagram_received(self, frame, addr):
+        self.acks_received += 1
+        self.sender.receive_ack(decode_frame(frame))
+        self._transmit(self.sender.fast_retransmit())
+        self._pump()
+
+    def _on_timeout(self):
+        self._timer_fired()
+        self._transmit(self.sender.check_timeout())
+        self._pump()
+
+    def _transmit(self, packets):
+        for packet in packets:
+            self.transport.sendto(encode_packet(packet), self.remote_addr)
+            self.frames_sent += 1
+
+    def _pump(self):
+        while self.sender.can_send_new_packet():
+            packet = self.sender.send_new_packet()
+            if packet:
+                self._transmit((packet,))
+
+        if self.sender.all_packets_confirmed():
+            self._set_timer(None, None)
+            if not self.done.done():
+                self.done.set_result(True)
+            return
+        self._set_timer(self.sender.next_timeout(), self._on_timeout)
+
+
+class ReceiverEndpoint(_Endpoint):
+    def __init__(self, loop, receiver, checksum=None):
+        super().__init__(loop)
+        self.receiver = receiver
+        self.checksum = checksum
+        self.reply_addr = None
+        self.frames_received = 0
+
+    def datagram_received(self, frame, addr):
+        self.frames_received += 1
+        self.reply_addr = addr
+        success, ack = self.receiver.receive_packet(decode_frame(frame, self.checksum))
+        if success:
+            self.transport.sendto(encode_ack(ack), addr)
+        self._set_timer(self.receiver.ack_deadline(), self._on_flush)
+
+    def _on_flush(self):
+        # Срок отложенного подтверждения истек
+        self._timer_fired()
+        ack = self.receiver.flush_ack(self.loop.time())
+        if ack is not None:
+            self.transport.sendto(encode_ack(ack), self.reply_addr)
+        self._set_timer(self.receiver.ack_deadline(), self._on_flush)
+
+
+class LossyProxy(_Endpoint):
+    """Посредник между отправителем и получателем
+
+    Потери, порча, задержка, полоса и очередь берутся из NetworkSimulator:
+    кадр данных декодируется, проходит через transmit_packet и пересылается
+    получателю в момент прихода, рассчитанный моделью канала.
+    """
+
+    def __init__(self, loop, network, receiver_addr, checksum=None):
+        super().__init__(loop)
+        self.network = network
+        self.receiver_addr = receiver_addr
+        self.checksum = checksum
+        self.sender_addr = None
+
+    def datagram_received(self, frame, addr):
+        if addr == self.receiver_addr:
+            # Подтверждение от получателя
+            if self.sender_addr is not None and self.network.transmit_ack(decode_frame(frame)):
+                self.loop.call_later(self.network.propagation_delay, self.transport.sendto, frame,
+                                     self.sender_addr)
+            return
+
+        self.sender_addr = addr
+        if self.network.transmit_packet(decode_frame(frame, self.checksum)):
+            arrival = self.network.packets_in_transit[-1][0]
+            self.loop.call_at(arrival, self._deliver, arrival)
+
+    def _deliver(self, arrival: float):
+        # Срок передается явно: call_at может сработать чуть раньше из-за разрешения часов
+        for packet in self.network.deliver_ready(arrival):
+            self.transport.sendto(encode_packet(packet), self.receiver_addr)
+
+
+async def transfer(data, window_size: int = 1, protocol_type: str = "auto", time_limit: float = None,
+                   **kwargs) -> dict:
+    """Передача через настоящие UDP-сокеты localhost: отправитель -> посредник -> получатель
+
+    Параметры те же, что у ProtocolSimulator; он же собирает отправителя, получателя
+    и модель канала, только на часах цикла событий.
+    """
+    for name in ('fec_group', 'tracer'):
+        if kwargs.get(name) is not None:
+            # Кодер FEC и трассировку вызывают циклы ProtocolSimulator, конечные точки UDP их не видят
+            raise ValueError(f"{name} не поддерживается в передаче через UDP")
+    loop = asyncio.get_running_loop()
+    simulator = ProtocolSimulator(data, window_size, protocol_type, **dict(kwargs, clock=LoopClock(loop)))
+    checksum = kwargs.get('checksum', 'crc32')
+    done = loop.create_future()
+
+    _, receiver = await loop.create_datagram_endpoint(
+        lambda: ReceiverEndpoint(loop, simulator.receiver, checksum), local_addr=(LOCALHOST, 0))
+    receiver_addr = receiver.transport.get_extra_info('sockname')
+    _, proxy = await loop.create_datagram_endpoint(
+        lambda: LossyProxy(loop, simulator.network, receiver_addr, checksum), local_addr=(LOCALHOST, 0))
+    proxy_addr = proxy.transport.get_extra_info('sockname')
+
+    start_time = loop.time()
+    _, sender = await loop.create_datagram_endpoint(
+        lambda: SenderEndpoint(loop, simulator.sender, proxy_addr, done), local_addr=(LOCALHOST, 0))
+    try:
+        await asyncio.wait_for(done, time_limit)
+    finally:
+        elapsed = loop.time() - start_time
+        for endpoint in (sender, proxy, receiver):
+            endpoint.close()
+
+    packets = simulator.sender.packets
+    success = simulator.verify_output()
+    simulator.close()
+    return {
+        'protocol': simulator.sender.get_protocol_name(),
+        'success': success,
+        'total_time': elapsed,
+        'total_sent': simulator.sender.stats['total_sent'],
+        'retransmissions': simulator.sender.stats['retransmissions'],
+        'frames_received': receiver.frames_received,
+        'acks_received': sender.acks_received,
+        'packets_per_sec': sender.frames_sent / elapsed,
+        'goodput': packets.total_bytes * 8 / elapsed
+    }
+
+
+def run_transfer(data, window_size: int = 1, protocol_type: str = "auto", **kwargs) -> dict:
+    return asyncio.run(transfer(data, window_size, protocol_type, **kwargs))
+
+
+def main(size: int = 1_000_000, package_data_size: int = 1000):
+    data = os.urandom(size)
+    protocols = [
+        ('Stop-and-Wait', "stop_and_wait", 1),
+        ('Go-Back-N', "go_back_n", 16),
+        ('Selective Repeat', "selective_repeat", 16)
+    ]
+    channels = [
+        ('без потерь', {'packet_loss_prob': 0.0, 'ack_loss_prob': 0.0, 'corruption_prob': 0.0}),
+        ('потери 5%', {'packet_loss_prob': 0.05, 'ack_loss_prob': 0.05, 'corruption_prob': 0.01})
+    ]
+
+    print(f"UDP localhost: {size} байт пакетами по {package_data_size} байт")
+    print(f"{'Канал':<12} {'Протокол':<18} {'Пакетов/с':<12} {'Мбит/с':<10} {'Повторы':<10} {'Время, с':<10}")
+    print("-" * 75)
+    for channel_name, channel in channels:
+        for name, protocol_type, window_size in protocols:
+            result = run_transfer(data, window_size, protocol_type, package_data_size=package_data_size,
+                                  timeout=0.05, timeout_policy="adaptive", **channel)
+            status = "" if result['success'] else " (ошибка сборки)"
+            print(f"{channel_name:<12} {name:<18} {result['packets_per_sec']:<12.0f} "
+                  f"{result['goodput'] / 1e6:<10.2f} {result['retransmissions']:<10} "
+                  f"{result['total_time']:<10.3f}{status}")
+
+
+if __name__ == "__main__":
+    main()